@@ -6,7 +6,8 @@ SQLite-based attendance tracking with check-in/check-out functionality
 import sqlite3
 import csv
 import os
-from datetime import datetime, date
+import time
+from datetime import datetime, date, timedelta
 try:
     import pandas as pd
 except ImportError:
@@ -14,16 +15,62 @@ except ImportError:
     pd = None
 from typing import List, Dict, Optional, Tuple
 
+# Seconds a cached employee query stays valid (other instances may write to the same file)
+EMPLOYEE_CACHE_TTL = 10
+
+def time_of_day(timestamp) -> str:
+    """Return the HH:MM:SS part of a stored "YYYY-MM-DD HH:MM:SS" timestamp"""
+    # Timestamps are always written in this fixed layout, so slicing replaces strptime
+    if isinstance(timestamp, str) and len(timestamp) >= 19 and timestamp[10] == ' ':
+        return timestamp[11:19]
+    return str(timestamp)
+
 class AttendanceDatabase:
+    # Shared instances by path, so every part of the app sees the same employee cache
+    _instances = {}
+    
     def __init__(self, db_path: str = "attendance.db"):
         """Initialize the attendance database"""
         self.db_path = db_path
+        # Employee query cache: key -> (timestamp, result); cleared whenever employees change
+        self._employee_cache = {}
+        self.employees_version = 0
         # Remove persistent connection attributes
         self.init_database()
     
+    @classmethod
+    def instance(cls, db_path: str = "attendance.db") -> "AttendanceDatabase":
+        """Return the process-wide database object for db_path, creating it on first use"""
+        db = cls._instances.get(db_path)
+        if db is None:
+            db = cls._instances[db_path] = cls(db_path)
+        return db
+    
     def _get_connection(self):
         """Get a new database connection for the current thread"""
-        return sqlite3.connect(self.db_path, check_same_thread=False)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # Per-connection tuning; WAL itself is persisted in the file by init_database
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-8000")
+        return conn
+    
+    def _get_cached_employees(self, key):
+        """Return a cached employee query result, or None if missing or expired"""
+        entry = self._employee_cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] < EMPLOYEE_CACHE_TTL:
+            return entry[1]
+        return None
+    
+    def _store_cached_employees(self, key, version, result):
+        """Cache a query result unless the employees changed while it ran"""
+        if self.employees_version == version:
+            self._employee_cache[key] = (time.monotonic(), result)
+    
+    def invalidate_cache(self):
+        """Drop cached employee queries, e.g. after a write or when another process may have written"""
+        self._employee_cache.clear()
+        self.employees_version += 1
     
     def init_database(self):
         """Initialize the database and create tables if they don't exist"""
@@ -31,6 +78,9 @@ class AttendanceDatabase:
             conn = self._get_connection()
             cursor = conn.cursor()
             
+            # WAL lets the UI read today's records while check-ins are written
+            cursor.execute("PRAGMA journal_mode=WAL")
+            
             # Create attendance table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS attendance (
@@ -63,7 +113,13 @@ class AttendanceDatabase:
                 CREATE INDEX IF NOT EXISTS idx_attendance_name_date 
                 ON attendance(name, date)
             ''')
-            
+
+            # Date-only lookups (today's check-ins, daily counts) can't use the name-first index
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_attendance_date_checkin
+                ON attendance(date, check_in_time)
+            ''')
+
             conn.commit()
             conn.close()
             print(f"Database initialized: {self.db_path}")
@@ -83,6 +139,7 @@ class AttendanceDatabase:
             ''', (name, employee_id, department, position))
             conn.commit()
             conn.close()
+            self.invalidate_cache()
             print(f"Employee {name} added successfully")
             return True
         except sqlite3.IntegrityError:
@@ -92,6 +149,30 @@ class AttendanceDatabase:
             print(f"Error adding employee: {e}")
             return False
     
+    def add_employees_bulk(self, names: List[str], department: Optional[str] = None,
+                           position: Optional[str] = None) -> List[str]:
+        """Add several employees in one transaction; returns the names actually inserted"""
+        inserted = []
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            for name in names:
+                # Existing names are skipped rather than aborting the batch
+                cursor.execute('''
+                    INSERT OR IGNORE INTO employees (name, employee_id, department, position)
+                    VALUES (?, NULL, ?, ?)
+                ''', (name, department, position))
+                if cursor.rowcount:
+                    inserted.append(name)
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            print(f"Error adding employees: {e}")
+            return []
+        if inserted:
+            self.invalidate_cache()
+        return inserted
+    
     def update_employee(self, old_name: str, new_name: str, 
                        employee_id: Optional[str] = None, 
                        department: Optional[str] = None, 
@@ -135,6 +216,7 @@ class AttendanceDatabase:
             
             conn.commit()
             conn.close()
+            self.invalidate_cache()
             print(f"Employee {old_name} updated successfully")
             return True
             
@@ -145,17 +227,28 @@ class AttendanceDatabase:
             print(f"Error updating employee: {e}")
             return False
     
-    def get_employees(self) -> List[Dict]:
-        """Get all active employees"""
+    def get_employees(self, limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """Get active employees, optionally one page of them"""
+        cache_key = ('employees', limit, offset)
+        cached = self._get_cached_employees(cache_key)
+        if cached is not None:
+            # Copy the rows too, so callers can't alter what later callers get
+            return [dict(employee) for employee in cached]
+        version = self.employees_version
         try:
             conn = self._get_connection()
             cursor = conn.cursor()
-            cursor.execute('''
+            query = '''
                 SELECT id, name, employee_id, department, position 
                 FROM employees 
                 WHERE is_active = 1
                 ORDER BY name
-            ''')
+            '''
+            params = []
+            if limit is not None:
+                query += " LIMIT ? OFFSET ?"
+                params.extend([limit, offset])
+            cursor.execute(query, params)
             employees = []
             for row in cursor.fetchall():
                 employees.append({
@@ -166,11 +259,63 @@ class AttendanceDatabase:
                     'position': row[4]
                 })
             conn.close()
-            return employees
+            self._store_cached_employees(cache_key, version, employees)
+            return [dict(employee) for employee in employees]
         except Exception as e:
             print(f"Error getting employees: {e}")
             return []
     
+    def count_employees(self) -> int:
+        """Count active employees"""
+        cached = self._get_cached_employees('count')
+        if cached is not None:
+            return cached
+        version = self.employees_version
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            cursor.execute('SELECT COUNT(*) FROM employees WHERE is_active = 1')
+            count = cursor.fetchone()[0]
+            conn.close()
+            self._store_cached_employees('count', version, count)
+            return count
+        except Exception as e:
+            print(f"Error counting employees: {e}")
+            return 0
+    
+    def count_checkins_on(self, target_date: str) -> int:
+        """Count check-ins recorded on the given date (YYYY-MM-DD)"""
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT COUNT(*) FROM attendance 
+                WHERE date = ? AND check_in_time IS NOT NULL
+            ''', (target_date,))
+            count = cursor.fetchone()[0]
+            conn.close()
+            return count
+        except Exception as e:
+            print(f"Error counting check-ins: {e}")
+            return 0
+
+    def get_checkins_on(self, target_date: str) -> List[Dict]:
+        """Get check-ins recorded on the given date (YYYY-MM-DD), earliest first"""
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT name, check_in_time FROM attendance
+                WHERE date = ? AND check_in_time IS NOT NULL
+                ORDER BY check_in_time
+            ''', (target_date,))
+            records = [{'name': row[0], 'check_in_time': row[1]} for row in cursor.fetchall()]
+            conn.close()
+            return records
+        except Exception as e:
+            print(f"Error getting check-ins: {e}")
+            return []
+
     def check_in(self, name: str, check_in_time: Optional[str] = None) -> bool:
         """Record check-in for an employee"""
         try:
@@ -288,6 +433,7 @@ class AttendanceDatabase:
         """Get attendance report with optional filters"""
         try:
             conn = self._get_connection()
+            conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             
             query = '''
@@ -312,16 +458,8 @@ class AttendanceDatabase:
             query += " ORDER BY date DESC, name"
             
             cursor.execute(query, params)
-            records = []
-            for row in cursor.fetchall():
-                records.append({
-                    'name': row[0],
-                    'date': row[1],
-                    'check_in_time': row[2],
-                    'check_out_time': row[3],
-                    'total_hours': row[4],
-                    'status': row[5]
-                })
+            # Rows map column names to values natively; dict() keeps the .get() interface callers use
+            records = [dict(row) for row in cursor.fetchall()]
             conn.close()
             return records
             
@@ -329,6 +467,46 @@ class AttendanceDatabase:
             print(f"Error getting attendance report: {e}")
             return []
     
+    def get_recent_checkins(self, name: str, limit: int = 5) -> List[Dict]:
+        """Get an employee's most recent check-ins, newest first"""
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT date, check_in_time, total_hours FROM attendance
+                WHERE name = ? AND check_in_time IS NOT NULL
+                ORDER BY check_in_time DESC
+                LIMIT ?
+            ''', (name, limit))
+            records = [{'date': row[0], 'check_in_time': row[1], 'total_hours': row[2]}
+                       for row in cursor.fetchall()]
+            conn.close()
+            return records
+        except Exception as e:
+            print(f"Error getting recent check-ins: {e}")
+            return []
+    
+    def get_employee_stats(self, name: str, week_start: str, month_start: str, today: str) -> Tuple[float, int, bool]:
+        """Get (hours since week_start, check-in days since month_start, has a record today) in one query"""
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT
+                    SUM(CASE WHEN date >= ? THEN total_hours END),
+                    COUNT(CASE WHEN date >= ? AND check_in_time IS NOT NULL THEN 1 END),
+                    COUNT(CASE WHEN date = ? THEN 1 END)
+                FROM attendance
+                WHERE name = ? AND date >= ? AND date <= ?
+            ''', (week_start, month_start, today, name, min(week_start, month_start), today))
+            hours_week, days_month, today_count = cursor.fetchone()
+            conn.close()
+            return (hours_week or 0, days_month, today_count > 0)
+            
+        except Exception as e:
+            print(f"Error getting employee stats: {e}")
+            return (0, 0, False)
+    
     def get_daily_summary(self, target_date: Optional[str] = None) -> Dict:
         """Get daily attendance summary"""
         try:
@@ -453,17 +631,16 @@ class AttendanceDatabase:
     def get_employee_attendance(self, employee_name: str, days: int = 30) -> List[Dict]:
         """Get attendance history for a specific employee"""
         try:
-            end_date = datetime.now().strftime("%Y-%m-%d")
+            now = datetime.now()
+            end_date = now.strftime("%Y-%m-%d")
             if pd is not None:
                 try:
-                    from datetime import timedelta
-                    start_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+                    start_date = (now - timedelta(days=days)).strftime("%Y-%m-%d")
                 except (AttributeError, TypeError, ValueError):
                     # Fallback: use current date
-                    start_date = datetime.now().strftime("%Y-%m-%d")
+                    start_date = end_date
             else:
-                from datetime import timedelta
-                start_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+                start_date = (now - timedelta(days=days)).strftime("%Y-%m-%d")
             return self.get_attendance_report(start_date, end_date, employee_name)
         except Exception as e:
             print(f"Error getting employee attendance: {e}")
@@ -526,6 +703,7 @@ class AttendanceDatabase:
             
             conn.commit()
             conn.close()
+            self.invalidate_cache()
             print(f"Employee {employee_name} and all their records deleted successfully")
             return True
             
@@ -534,8 +712,16 @@ class AttendanceDatabase:
             return False
     
     def close(self):
-        """Close database connection - now this is a no-op since we don't maintain persistent connections"""
-        print("Database connections are now managed per-operation")
+        """Fold the WAL back into the main file; connections themselves are managed per-operation"""
+        # The shared instance outlives a close (e.g. a system reset), so don't serve old results
+        self.invalidate_cache()
+        try:
+            conn = self._get_connection()
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.execute("PRAGMA optimize")
+            conn.close()
+        except Exception as e:
+            print(f"Error checkpointing database: {e}")
 
 def main():
     """Main function to demonstrate the attendance database"""
@@ -1,14 +1,20 @@
+import os
 import time
 import csv
+from collections import deque
 from datetime import datetime
-from attendance_database import AttendanceDatabase
+from attendance_database import AttendanceDatabase, time_of_day
 from ui_dialogs import CustomDialog
 import tkinter as tk
 
+# Maximum number of entries kept in the on-screen check-in history
+MAX_HISTORY_ENTRIES = 100
+
 class AttendanceManager:
     """Handles attendance-related operations"""
     
     def __init__(self):
+        self.checkin_history = deque(maxlen=MAX_HISTORY_ENTRIES)
         self.attendance_db = None
         self.last_recognition_time = {}
         self.recognition_cooldown = 1
@@ -20,7 +26,7 @@ class AttendanceManager:
     def initialize_attendance_database(self):
         """Initialize attendance database"""
         try:
-            self.attendance_db = AttendanceDatabase()
+            self.attendance_db = AttendanceDatabase.instance()
             print("Attendance database initialized")
             return True
         except Exception as e:
@@ -68,52 +74,43 @@ class AttendanceManager:
             return
             
         try:
-            import os
-            # Get all existing users from dataset
-            dataset_users = set()
-            if os.path.exists('dataset'):
-                for dirname in os.listdir('dataset'):
-                    dir_path = os.path.join('dataset', dirname)
-                    if os.path.isdir(dir_path):
-                        txt_file = os.path.join(dir_path, f"{dirname}.txt")
-                        if os.path.exists(txt_file):
-                            with open(txt_file, 'r') as f:
-                                name = f.read().strip()
-                                if name:
-                                    dataset_users.add(name)
+            # Names already in the database; dataset users are checked against
+            # this as they are read instead of collecting a second set to diff
+            existing_employees = frozenset(employee['name'] for employee in self.attendance_db.get_employees())
             
-            # Get existing employees from database
-            existing_employees = set()
+            # scandir entries carry their type, so each user folder costs one
+            # open instead of isdir/exists stats
+            dataset_count = 0
+            pending = []
             try:
-                employees = self.attendance_db.get_employees()
-                for employee in employees:
-                    existing_employees.add(employee['name'])
-            except:
+                with os.scandir('dataset') as entries:
+                    for entry in entries:
+                        if not entry.is_dir():
+                            continue
+                        try:
+                            with open(os.path.join(entry.path, f"{entry.name}.txt"), 'r') as f:
+                                name = f.read().strip()
+                        except FileNotFoundError:
+                            continue
+                        if name:
+                            dataset_count += 1
+                            if name not in existing_employees:
+                                pending.append(name)
+            except FileNotFoundError:
                 pass
             
-            # Find users in dataset but not in database
-            new_users = dataset_users - existing_employees
-            
-            # Add missing users to database
-            added_count = 0
-            for user_name in new_users:
-                try:
-                    success = self.attendance_db.add_employee(
-                        name=user_name,
-                        employee_id=None,
-                        department="Face Recognition",
-                        position="Employee"
-                    )
-                    if success:
-                        added_count += 1
-                        print(f"Synced '{user_name}' to database")
-                except Exception as e:
-                    print(f"Failed to sync '{user_name}': {e}")
+            # Add users in dataset but not in database, in one transaction
+            # (duplicate folder names are skipped by the bulk insert)
+            synced = self.attendance_db.add_employees_bulk(
+                sorted(pending), department="Face Recognition", position="Employee")
+            for user_name in synced:
+                print(f"Synced '{user_name}' to database")
+            added_count = len(synced)
             
             if added_count > 0:
                 print(f"Synced {added_count} users from dataset to database")
-            elif len(dataset_users) > 0:
-                print(f"All {len(dataset_users)} dataset users are already in database")
+            elif dataset_count > 0:
+                print(f"All {dataset_count} dataset users are already in database")
             else:
                 print("No users found in dataset to sync")
                 
@@ -178,38 +175,25 @@ class AttendanceManager:
             # Get today's date
             today = datetime.now().strftime("%Y-%m-%d")
             
-            # Get today's attendance records
-            records = self.attendance_db.get_attendance_report(today, today)
-            
-            # Filter for records with check-in times
-            checkins = [record for record in records if record.get('check_in_time')]
+            # Get today's check-ins, already ordered by check-in time
+            checkins = self.attendance_db.get_checkins_on(today)
             
             # Update the textbox
             textbox.config(state=tk.NORMAL)
             textbox.delete(1.0, tk.END)
+            self.checkin_history.clear()
             
             if checkins:
                 self.has_checkins_today = True
-                # Sort by check-in time
-                checkins.sort(key=lambda x: x['check_in_time'])
                 
                 for record in checkins:
                     name = record['name']
-                    # Parse and format the check-in time
-                    check_in_time = record['check_in_time']
-                    if isinstance(check_in_time, str):
-                        try:
-                            # Try to parse the time string and format it
-                            time_obj = datetime.strptime(check_in_time, "%Y-%m-%d %H:%M:%S")
-                            formatted_time = time_obj.strftime("%H:%M:%S")
-                        except:
-                            # If parsing fails, use the original string
-                            formatted_time = check_in_time
-                    else:
-                        formatted_time = str(check_in_time)
+                    formatted_time = time_of_day(record['check_in_time'])
                     
-                    entry = f"✅ {name} - {formatted_time}\n"
-                    textbox.insert(tk.END, entry)
+                    self.checkin_history.append(f"✅ {name} - {formatted_time}\n")
+                
+                # Insert the (capped) history in one call
+                textbox.insert(tk.END, "".join(self.checkin_history))
                 
                 # Auto-scroll to the bottom
                 textbox.see(tk.END)
@@ -228,21 +212,21 @@ class AttendanceManager:
             textbox.insert(tk.END, "No check-ins today\n")
             textbox.config(state=tk.DISABLED)
     
-    def update_last_checkin_display(self, name, textbox):
-        """Update the check-in history in the textbox"""
-        self.last_checkin_name = name
-        self.last_checkin_time = datetime.now().strftime("%H:%M:%S")
-        
-        # Enable text editing
+    def append_history_entry(self, textbox, entry):
+        """Append one line to the check-in history, dropping the oldest beyond capacity"""
         textbox.config(state=tk.NORMAL)
         
         # Clear the initial message on first check-in
         if not self.has_checkins_today:
             textbox.delete(1.0, tk.END)
+            self.checkin_history.clear()
             self.has_checkins_today = True
         
-        # Add new check-in entry with timestamp and name
-        entry = f"✅ {name} - {self.last_checkin_time}\n"
+        # Keep the widget bounded so inserts stay cheap on busy days
+        if len(self.checkin_history) == self.checkin_history.maxlen:
+            textbox.delete('1.0', '2.0')
+        self.checkin_history.append(entry)
+        
         textbox.insert(tk.END, entry)
         
         # Auto-scroll to the bottom to show the latest entry
@@ -251,6 +235,14 @@ class AttendanceManager:
         # Disable text editing to prevent user modification
         textbox.config(state=tk.DISABLED)
     
+    def update_last_checkin_display(self, name, textbox):
+        """Update the check-in history in the textbox"""
+        self.last_checkin_name = name
+        self.last_checkin_time = datetime.now().strftime("%H:%M:%S")
+        
+        # Add new check-in entry with timestamp and name
+        self.append_history_entry(textbox, f"✅ {name} - {self.last_checkin_time}\n")
+    
     def export_attendance_report(self, root):
         """Export attendance report to CSV"""
         if not self.attendance_db:
@@ -300,8 +292,7 @@ class AttendanceManager:
             
             # Get today's checked-in count from database
             current_date = datetime.now().strftime("%Y-%m-%d")
-            records = self.attendance_db.get_attendance_report(current_date, current_date)
-            checked_in_count = len([record for record in records if record['check_in_time']])
+            checked_in_count = self.attendance_db.count_checkins_on(current_date)
             
             summary_text = f"""Today's Attendance Summary:
 
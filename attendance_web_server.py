@@ -6,9 +6,10 @@ Remote web interface for attendance management
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
 from datetime import datetime, date
 import os
+from operator import itemgetter
 import threading
 import time
-from attendance_database import AttendanceDatabase
+from attendance_database import AttendanceDatabase, time_of_day
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-here'  # Change this in production
@@ -44,13 +45,7 @@ def index():
     for name, record in checked_in_employees.items():
         check_in_time = record['check_in_time']
         # Extract just the time part if it's a full datetime
-        if isinstance(check_in_time, str) and ' ' in check_in_time:
-            try:
-                time_part = datetime.strptime(check_in_time, '%Y-%m-%d %H:%M:%S').strftime('%H:%M:%S')
-            except:
-                time_part = check_in_time
-        else:
-            time_part = str(check_in_time)
+        time_part = time_of_day(check_in_time)
         
         employee_checkins.append({
             'name': name,
@@ -71,7 +66,7 @@ def index():
             })
     
     # Sort by check-in time (latest first), with absent employees at the end
-    employee_checkins.sort(key=lambda x: x['sort_time'], reverse=True)
+    employee_checkins.sort(key=itemgetter('sort_time'), reverse=True)
   
     return render_template('index.html', 
                          summary=summary, 
@@ -98,13 +93,7 @@ def dashboard():
     for name, record in checked_in_employees.items():
         check_in_time = record['check_in_time']
         # Extract just the time part if it's a full datetime
-        if isinstance(check_in_time, str) and ' ' in check_in_time:
-            try:
-                time_part = datetime.strptime(check_in_time, '%Y-%m-%d %H:%M:%S').strftime('%H:%M:%S')
-            except:
-                time_part = check_in_time
-        else:
-            time_part = str(check_in_time)
+        time_part = time_of_day(check_in_time)
         
         employee_checkins.append({
             'name': name,
@@ -125,7 +114,7 @@ def dashboard():
             })
     
     # Sort by check-in time (latest first), with absent employees at the end
-    employee_checkins.sort(key=lambda x: x['sort_time'], reverse=True)
+    employee_checkins.sort(key=itemgetter('sort_time'), reverse=True)
     
     return render_template('dashboard.html', 
                          summary=summary, 
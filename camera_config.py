@@ -1,6 +1,69 @@
 import json
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+# Allowed (min, max) range for numeric configuration values, checked on load and on save
+CONFIG_RANGES = {
+    "frame_width": (160, 1920),
+    "frame_height": (120, 1080),
+    "target_fps": (1, 60),
+    "buffer_size": (1, 10),
+    "auto_exposure": (0.0, 1.0),
+    "face_detection_interval": (1, 30),
+    "min_face_size": (10, 320),
+    "recognition_threshold": (0.1, 1.0),
+    "detection_confidence_threshold": (0.1, 1.0),
+    "detection_scale_factor": (0.1, 1.0),
+}
+
+# Human-readable descriptions shown next to each field in the settings dialog
+CONFIG_DESCRIPTIONS = {
+    # Camera Hardware
+    "camera_index": "Camera device index (0=default, 1=external)",
+    "frame_width": "Camera frame width in pixels (160-1920)",
+    "frame_height": "Camera frame height in pixels (120-1080)",
+    "target_fps": "Target frames per second (1-60)",
+    "buffer_size": "Camera buffer size (1-10)",
+    "auto_exposure": "Auto exposure setting (0.0-1.0)",
+    "brightness": "Camera brightness adjustment (-100 to 100)",
+    "contrast": "Camera contrast adjustment (-100 to 100)",
+    "saturation": "Camera saturation adjustment (-100 to 100)",
+    "gain": "Camera gain adjustment (0-100)",
+    
+    # Video Processing
+    "face_detection_interval": "Face detection frequency (every N frames)",
+    "face_cache_size": "Number of cached face detections",
+    "frame_rotation": "Frame rotation (90_ccw, 90_cw, 180, none)",
+    "flip_horizontal": "Mirror flip video horizontally (true/false)",
+    "flip_vertical": "Flip video vertically (true/false)",
+    
+    # Face Tracking
+    "max_track_distance": "Maximum distance for face tracking",
+    "track_timeout": "Frames before dropping lost tracks",
+    "tracking_enabled": "Enable face tracking across frames",
+    
+    # Face Detection
+    "min_face_size": "Minimum face size for detection (pixels)",
+    "detection_scale_factor": "Scale factor for detection (0.1-1.0)",
+    "mtcnn_threshold_1": "MTCNN stage 1 threshold (0.1-1.0)",
+    "mtcnn_threshold_2": "MTCNN stage 2 threshold (0.1-1.0)",
+    "mtcnn_threshold_3": "MTCNN stage 3 threshold (0.1-1.0)",
+    "detection_confidence_threshold": "Detection confidence threshold",
+    "min_face_region_size": "Minimum face region size (pixels)",
+    
+    # Face Recognition
+    "recognition_threshold": "Recognition confidence threshold",
+    "recognition_interval": "Recognition frequency (every N frames)",
+    "embedding_cache_size": "Size of embedding cache",
+    "recognition_backend": "Recognition model backend (torch, onnx_int8 = quantized CPU model)",
+    "confidence_boost_factor": "Confidence increase rate",
+    "confidence_decay_factor": "Confidence decrease rate",
+    
+    # Performance
+    "memory_cleanup_interval": "Memory cleanup frequency (seconds)",
+    "enable_gpu": "Use GPU acceleration if available",
+    "image_quality": "Processing quality (low/medium/high)"
+}
 
 class CameraConfig:
     """Manages camera and face processing configuration settings"""
@@ -50,11 +113,12 @@ class CameraConfig:
             "recognition_threshold": 0.7,
             "recognition_interval": 3,  # Process every Nth frame
             "embedding_cache_size": 100,
+            "recognition_backend": "torch",  # torch, onnx_int8
             "confidence_boost_factor": 0.1,
             "confidence_decay_factor": 0.05,
             
             # Performance Settings
-            "memory_cleanup_interval": 10,
+            "memory_cleanup_interval": 30,  # Seconds between gc passes
             "enable_gpu": True,
             "image_quality": "medium"  # low, medium, high
         }
@@ -77,14 +141,14 @@ class CameraConfig:
             print(f"❌ Error loading camera config: {e}")
             print("Using default configuration")
     
-    def save_config(self) -> bool:
-        """Save configuration to file"""
+    def save_config(self, config: Optional[Dict[str, Any]] = None) -> bool:
+        """Save configuration to file (config: a snapshot to write instead of the live dict)"""
         try:
             # Ensure the config directory exists
             os.makedirs(os.path.dirname(self.config_file) if os.path.dirname(self.config_file) else '.', exist_ok=True)
             
             with open(self.config_file, 'w') as f:
-                json.dump(self.config, f, indent=4)
+                json.dump(self.config if config is None else config, f, indent=4)
             print(f"✅ Camera configuration saved to {self.config_file}")
             return True
         except Exception as e:
@@ -155,20 +219,8 @@ class CameraConfig:
     
     def validate_config(self) -> bool:
         """Validate configuration values"""
-        validators = {
-            "frame_width": lambda x: 160 <= x <= 1920,
-            "frame_height": lambda x: 120 <= x <= 1080,
-            "target_fps": lambda x: 1 <= x <= 60,
-            "buffer_size": lambda x: 1 <= x <= 10,
-            "auto_exposure": lambda x: 0.0 <= x <= 1.0,
-            "face_detection_interval": lambda x: 1 <= x <= 30,
-            "min_face_size": lambda x: 10 <= x <= 320,
-            "recognition_threshold": lambda x: 0.1 <= x <= 1.0,
-            "detection_confidence_threshold": lambda x: 0.1 <= x <= 1.0,
-        }
-        
-        for key, validator in validators.items():
-            if key in self.config and not validator(self.config[key]):
+        for key, (low, high) in CONFIG_RANGES.items():
+            if key in self.config and not low <= self.config[key] <= high:
                 print(f"❌ Invalid value for {key}: {self.config[key]}")
                 return False
         
@@ -176,53 +228,7 @@ class CameraConfig:
     
     def get_config_description(self, key: str) -> str:
         """Get human-readable description for configuration keys"""
-        descriptions = {
-            # Camera Hardware
-            "camera_index": "Camera device index (0=default, 1=external)",
-            "frame_width": "Camera frame width in pixels (160-1920)",
-            "frame_height": "Camera frame height in pixels (120-1080)",
-            "target_fps": "Target frames per second (1-60)",
-            "buffer_size": "Camera buffer size (1-10)",
-            "auto_exposure": "Auto exposure setting (0.0-1.0)",
-            "brightness": "Camera brightness adjustment (-100 to 100)",
-            "contrast": "Camera contrast adjustment (-100 to 100)",
-            "saturation": "Camera saturation adjustment (-100 to 100)",
-            "gain": "Camera gain adjustment (0-100)",
-            
-            # Video Processing
-            "face_detection_interval": "Face detection frequency (every N frames)",
-            "face_cache_size": "Number of cached face detections",
-            "frame_rotation": "Frame rotation (90_ccw, 90_cw, 180, none)",
-            "flip_horizontal": "Mirror flip video horizontally (true/false)",
-            "flip_vertical": "Flip video vertically (true/false)",
-            
-            # Face Tracking
-            "max_track_distance": "Maximum distance for face tracking",
-            "track_timeout": "Frames before dropping lost tracks",
-            "tracking_enabled": "Enable face tracking across frames",
-            
-            # Face Detection
-            "min_face_size": "Minimum face size for detection (pixels)",
-            "detection_scale_factor": "Scale factor for detection (0.1-1.0)",
-            "mtcnn_threshold_1": "MTCNN stage 1 threshold (0.1-1.0)",
-            "mtcnn_threshold_2": "MTCNN stage 2 threshold (0.1-1.0)",
-            "mtcnn_threshold_3": "MTCNN stage 3 threshold (0.1-1.0)",
-            "detection_confidence_threshold": "Detection confidence threshold",
-            "min_face_region_size": "Minimum face region size (pixels)",
-            
-            # Face Recognition
-            "recognition_threshold": "Recognition confidence threshold",
-            "recognition_interval": "Recognition frequency (every N frames)",
-            "embedding_cache_size": "Size of embedding cache",
-            "confidence_boost_factor": "Confidence increase rate",
-            "confidence_decay_factor": "Confidence decrease rate",
-            
-            # Performance
-            "memory_cleanup_interval": "Memory cleanup frequency (frames)",
-            "enable_gpu": "Use GPU acceleration if available",
-            "image_quality": "Processing quality (low/medium/high)"
-        }
-        return descriptions.get(key, "Configuration parameter")
+        return CONFIG_DESCRIPTIONS.get(key, "Configuration parameter")
 
 # Global instance
 camera_config = CameraConfig() 
\ No newline at end of file
@@ -2,22 +2,87 @@ import cv2
 import numpy as np
 import time
 import gc
+import threading
 from PIL import Image, ImageTk
 from collections import deque
+from functools import lru_cache
 from typing import Optional
 from camera_config import camera_config
 
+# Drawing constants (BGR)
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+WHITE = (255, 255, 255)
+GREEN = (0, 255, 0)
+YELLOW = (0, 255, 255)
+BLUE = (255, 0, 0)
+CYAN = (255, 255, 0)
+MAGENTA = (255, 0, 255)
+
+PAUSED_TEXT_ORIGIN = (150, 150)
+
+@lru_cache(maxsize=256)
+def get_text_size(text, scale, thickness):
+    """Get (width, height) of a text label such as a face name, measuring each distinct string only once"""
+    return cv2.getTextSize(text, FONT, scale, thickness)[0]
+
+
+def render_text_sprite(text, scale, thickness, color=WHITE):
+    """Rasterize a fixed string once - returns (sprite, mask, baseline origin within the sprite)"""
+    (text_w, text_h), baseline = cv2.getTextSize(text, FONT, scale, thickness)
+    sprite = np.zeros((text_h + baseline + 2 * thickness, text_w + 2 * thickness, 3), dtype=np.uint8)
+    sprite_origin = (thickness, text_h + thickness)
+    cv2.putText(sprite, text, sprite_origin, FONT, scale, color, thickness)
+    return sprite, sprite.any(axis=2), sprite_origin
+
+
+def blit_text_sprite(frame, sprite, mask, sprite_origin, origin):
+    """Copy a pre-rendered text sprite onto frame with its baseline at origin"""
+    x = origin[0] - sprite_origin[0]
+    y = origin[1] - sprite_origin[1]
+    x0, y0 = max(x, 0), max(y, 0)
+    x1 = min(x + sprite.shape[1], frame.shape[1])
+    y1 = min(y + sprite.shape[0], frame.shape[0])
+    if x0 >= x1 or y0 >= y1:
+        return
+    roi = frame[y0:y1, x0:x1]
+    sx, sy = x0 - x, y0 - y
+    np.copyto(roi, sprite[sy:sy + (y1 - y0), sx:sx + (x1 - x0)],
+              where=mask[sy:sy + (y1 - y0), sx:sx + (x1 - x0), None])
+
+
 class CameraHandler:
     """Handles camera operations and video processing"""
     
     def __init__(self):
         self.camera = None
+        # Background grabber keeps the latest camera frame so readers never block on the device
+        self._latest_frame: Optional[np.ndarray] = None
+        self._frame_lock = threading.Lock()
+        # Guards frame_count and face_cache, written by the video worker and read on the Tk thread
+        self._state_lock = threading.Lock()
+        # Each grabber thread gets its own stop/release events, so a thread still
+        # blocked in read() cannot be revived by a later start
+        self._grabber_stop = threading.Event()
+        self._grabber_release = threading.Event()
+        self._grabber_thread = None
         self.frame_count = 0
         self.last_frame_time = time.time()
         self.canvas_size = None
         self.current_frame_tk = None
+        # Persistent canvas items so frames are updated in place instead of
+        # deleting and recreating everything on every tick
+        self._canvas = None
+        self._image_item = None
+        self._text_item = None
+        self._shown_frame = None
+        self._shown_time_label = None
+        self._shown_size = None
+        self._resize_buf: Optional[np.ndarray] = None
+        self._rgb_buf: Optional[np.ndarray] = None
         self.last_display_frame: Optional[np.ndarray] = None
-        self.video_paused = False
+        self._video_paused = threading.Event()
+        self._paused_overlay: Optional[np.ndarray] = None
+        self._wait_sprite, self._wait_mask, self._wait_origin = render_text_sprite("Please wait...", 0.8, 2)
         self.time_label=""
         # Face tracking for persistent recognition
         self.tracked_faces = {}
@@ -27,12 +92,38 @@ class CameraHandler:
         # Load dynamic configuration
         self.update_config()
     
+    @property
+    def video_paused(self):
+        """Whether live video processing is paused (training, menu, dialogs)"""
+        return self._video_paused.is_set()
+    
+    @video_paused.setter
+    def video_paused(self, paused):
+        # Entering pause state invalidates the cached "Please wait..." frame
+        if paused and not self._video_paused.is_set():
+            self._paused_overlay = None
+        if paused:
+            self._video_paused.set()
+        else:
+            self._video_paused.clear()
+    
+    def get_paused_overlay(self, frame):
+        """Get the annotated pause frame, building it once per pause"""
+        if self._paused_overlay is None:
+            source = self.last_display_frame if self.last_display_frame is not None else frame
+            paused_frame = source.copy()
+            blit_text_sprite(paused_frame, self._wait_sprite, self._wait_mask, self._wait_origin, PAUSED_TEXT_ORIGIN)
+            self._paused_overlay = paused_frame
+        return self._paused_overlay
+    
     def update_config(self):
         """Update configuration from camera_config"""
         self.target_fps = camera_config.get("target_fps", 10)
         self.frame_interval = 1000 // self.target_fps
         self.face_detection_interval = camera_config.get("face_detection_interval", 5)
-        self.face_cache = deque(maxlen=camera_config.get("face_cache_size", 10))
+        self.recognition_interval = camera_config.get("recognition_interval", 3)
+        with self._state_lock:
+            self.face_cache = deque(maxlen=camera_config.get("face_cache_size", 10))
         self.max_track_distance = camera_config.get("max_track_distance", 50)
         self.track_timeout = camera_config.get("track_timeout", 30)
         
@@ -76,23 +167,73 @@ class CameraHandler:
                 print(f"Some camera properties not supported: {e}")
             
             print(f"✅ Camera started with settings: {cam_props['width']}x{cam_props['height']} @ {cam_props['fps']}fps")
+            self.start_frame_grabber()
             return True
             
         except Exception as e:
             print(f"❌ Failed to start camera: {e}")
             return False
     
+    def start_frame_grabber(self):
+        """Start the background thread that continuously reads from the camera"""
+        self.stop_frame_grabber()
+        self._grabber_stop = threading.Event()
+        self._grabber_release = threading.Event()
+        self._grabber_thread = threading.Thread(target=self._grab_frames,
+                                                args=(self.camera, self._grabber_stop, self._grabber_release),
+                                                daemon=True)
+        self._grabber_thread.start()
+    
+    def stop_frame_grabber(self, release_camera=False):
+        """Stop the background frame grabber; with release_camera the grabber releases the capture on exit"""
+        if self._grabber_thread is not None:
+            if release_camera:
+                self._grabber_release.set()
+            self._grabber_stop.set()
+            self._grabber_thread.join(timeout=1.0)
+            if self._grabber_thread.is_alive():
+                # Still blocked in read(); it releases the capture once the read returns
+                print("Frame grabber still reading; camera will be released when it stops")
+            elif release_camera and self.camera is not None:
+                # The thread may have exited on a read error before the release was
+                # requested; releasing an already released capture is a no-op
+                self.camera.release()
+            self._grabber_thread = None
+        with self._frame_lock:
+            self._latest_frame = None
+    
+    def _grab_frames(self, camera, stop, release):
+        """Grabber thread loop - blocking reads happen here, never on the reader side"""
+        try:
+            while not stop.is_set():
+                try:
+                    ret, frame = camera.read()
+                except Exception as e:
+                    print(f"Frame grabber error: {e}")
+                    break
+                if ret and frame is not None:
+                    with self._frame_lock:
+                        self._latest_frame = frame
+                else:
+                    time.sleep(0.01)
+        finally:
+            # Releasing here guarantees no read() is in flight on this capture
+            if release.is_set():
+                camera.release()
+    
     def get_cached_faces(self, frame, face_processor):
         """Get faces with intelligent caching"""
         # Use cached faces if available and recent
-        if len(self.face_cache) > 0 and self.frame_count % self.face_detection_interval != 0:
-            return self.face_cache[-1] if self.face_cache else []
+        with self._state_lock:
+            if self.face_cache and self.frame_count % self.face_detection_interval != 0:
+                return self.face_cache[-1]
         
-        # Detect new faces
+        # Detect new faces (outside the lock, detection is the slow part)
         faces = face_processor.detect_faces_optimized(frame)
         
         # Cache the result
-        self.face_cache.append(faces)
+        with self._state_lock:
+            self.face_cache.append(faces)
         
         return faces
     
@@ -120,16 +261,18 @@ class CameraHandler:
             if win_w <= 0 or win_h <= 0:
                 return
             
-            # Convert and resize efficiently
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frame_pil = Image.fromarray(frame_rgb)
+            # Nothing changed since the last blit (e.g. paused frame) - skip the repaint
+            if frame is self._shown_frame and self.time_label == self._shown_time_label and canvas is self._canvas:
+                return
+            
+            frame_height, frame_width = frame.shape[:2]
             
             # Validate frame dimensions
-            if frame_pil.width <= 0 or frame_pil.height <= 0:
+            if frame_width <= 0 or frame_height <= 0:
                 return
             
             # Calculate optimal size with validation
-            frame_aspect = frame_pil.width / frame_pil.height
+            frame_aspect = frame_width / frame_height
             window_aspect = win_w / win_h
             
             if frame_aspect > window_aspect:
@@ -147,65 +290,82 @@ class CameraHandler:
             if new_width <= 0 or new_height <= 0:
                 return
             
-            # Resize with optimized method
-            frame_pil = frame_pil.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            # Resize and convert with OpenCV into buffers reused across frames
+            if self._resize_buf is None or self._resize_buf.shape[:2] != (new_height, new_width):
+                self._resize_buf = np.empty((new_height, new_width, 3), dtype=np.uint8)
+                self._rgb_buf = np.empty((new_height, new_width, 3), dtype=np.uint8)
+            cv2.resize(frame, (new_width, new_height), dst=self._resize_buf, interpolation=cv2.INTER_LINEAR)
+            cv2.cvtColor(self._resize_buf, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
+            
+            # Wrap the RGB buffer without copying
+            frame_pil = Image.frombuffer('RGB', (new_width, new_height), self._rgb_buf, 'raw', 'RGB', 0, 1)
             
-            # Convert to PhotoImage
-            frame_tk = ImageTk.PhotoImage(frame_pil)
+            # Reuse the Tk image while the display size is unchanged - paste() updates it in place
+            frame_tk = self.current_frame_tk
+            if frame_tk is not None and (frame_tk.width(), frame_tk.height()) == (new_width, new_height):
+                frame_tk.paste(frame_pil)
+                image_changed = False
+            else:
+                frame_tk = ImageTk.PhotoImage(frame_pil)
+                image_changed = True
             
-            # Update canvas
-            canvas.delete("all")
             x_offset = (win_w - new_width) // 2
             y_offset = (win_h - new_height) // 2
-            canvas.create_image(x_offset, y_offset, anchor='nw', image=frame_tk)
-            canvas.create_text(
-            canvas.winfo_width() / 2, # X-coordinate (center of canvas)
-            80, # Y-coordinate (center of canvas)
-            text=self.time_label,
-            fill="white", # Text color
-            font=("Arial", 50, "bold"),
-            anchor="center" # Center the text
-            )
+            
+            # Create canvas items once, then only update them in place
+            if self._canvas is not canvas or self._image_item is None or self.canvas_size != self._shown_size:
+                canvas.delete("all")
+                self._image_item = canvas.create_image(x_offset, y_offset, anchor='nw', image=frame_tk)
+                self._text_item = canvas.create_text(
+                    canvas.winfo_width() / 2,  # X-coordinate (center of canvas)
+                    80,  # Y-coordinate
+                    text=self.time_label,
+                    fill="white",  # Text color
+                    font=("Arial", 50, "bold"),
+                    anchor="center"  # Center the text
+                )
+                self._canvas = canvas
+                self._shown_size = self.canvas_size
+            else:
+                if image_changed:
+                    canvas.coords(self._image_item, x_offset, y_offset)
+                    canvas.itemconfigure(self._image_item, image=frame_tk)
+                if self.time_label != self._shown_time_label:
+                    canvas.itemconfigure(self._text_item, text=self.time_label)
+            
             # Keep reference
             self.current_frame_tk = frame_tk
+            self._shown_frame = frame
+            self._shown_time_label = self.time_label
             
         except Exception as e:
             print(f"Display error: {e}")
     
-    def calculate_rectangle_distance(self, rect1, rect2):
-        """Calculate distance between two rectangles (center-to-center)"""
-        x1, y1, w1, h1 = rect1
-        x2, y2, w2, h2 = rect2
-        
-        # Calculate centers
-        center1_x = x1 + w1 // 2
-        center1_y = y1 + h1 // 2
-        center2_x = x2 + w2 // 2
-        center2_y = y2 + h2 // 2
-        
-        # Euclidean distance
-        distance = ((center1_x - center2_x) ** 2 + (center1_y - center2_y) ** 2) ** 0.5
-        return distance
-    
     def match_faces_to_tracks(self, current_faces):
         """Match current face rectangles to existing tracks"""
         matched_pairs = []
         unmatched_faces = list(range(len(current_faces)))
         unmatched_tracks = list(self.tracked_faces.keys())
         
-        # Find best matches based on distance
-        for face_idx, face_rect in enumerate(current_faces):
+        # Track centers only need computing once per call
+        track_centers = {}
+        for track_id in unmatched_tracks:
+            tx, ty, tw, th = self.tracked_faces[track_id]['rectangle']
+            track_centers[track_id] = (tx + tw // 2, ty + th // 2)
+        
+        # Find best matches based on (squared) center-to-center distance
+        max_distance_sq = self.max_track_distance * self.max_track_distance
+        for face_idx, (x, y, w, h) in enumerate(current_faces):
+            cx, cy = x + w // 2, y + h // 2
             best_track_id = None
-            best_distance = float('inf')
+            best_distance_sq = max_distance_sq
             
             for track_id in unmatched_tracks:
-                track_data = self.tracked_faces[track_id]
-                track_rect = track_data['rectangle']
+                tcx, tcy = track_centers[track_id]
+                distance_sq = (cx - tcx) * (cx - tcx) + (cy - tcy) * (cy - tcy)
                 
-                distance = self.calculate_rectangle_distance(face_rect, track_rect)
-                
-                if distance < self.max_track_distance and distance < best_distance:
-                    best_distance = distance
+                if distance_sq < best_distance_sq:
+                    best_distance_sq = distance_sq
                     best_track_id = track_id
             
             if best_track_id is not None:
@@ -217,6 +377,9 @@ class CameraHandler:
     
     def update_face_tracking(self, current_faces, face_names):
         """Update face tracking data with current frame information"""
+        with self._state_lock:
+            frame_count = self.frame_count
+        
         # Match current faces to existing tracks
         matched_pairs, unmatched_faces, unmatched_tracks = self.match_faces_to_tracks(current_faces)
         
@@ -224,7 +387,7 @@ class CameraHandler:
         for face_idx, track_id in matched_pairs:
             track_data = self.tracked_faces[track_id]
             track_data['rectangle'] = current_faces[face_idx]
-            track_data['last_seen'] = self.frame_count
+            track_data['last_seen'] = frame_count
             
             # Update name if recognition was successful
             if face_idx < len(face_names) and face_names[face_idx] != "Unknown":
@@ -247,15 +410,15 @@ class CameraHandler:
                 'rectangle': current_faces[face_idx],
                 'name': name,
                 'confidence': confidence,
-                'last_seen': self.frame_count,
-                'created_frame': self.frame_count
+                'last_seen': frame_count,
+                'created_frame': frame_count
             }
         
         # Remove old tracks that haven't been seen
         tracks_to_remove = []
         for track_id in unmatched_tracks:
             track_data = self.tracked_faces[track_id]
-            if self.frame_count - track_data['last_seen'] > self.track_timeout:
+            if frame_count - track_data['last_seen'] > self.track_timeout:
                 tracks_to_remove.append(track_id)
         
         for track_id in tracks_to_remove:
@@ -263,47 +426,78 @@ class CameraHandler:
     
     def get_tracked_face_info(self, face_rect):
         """Get tracking information for a face rectangle"""
-        for track_id, track_data in self.tracked_faces.items():
-            if self.calculate_rectangle_distance(face_rect, track_data['rectangle']) < 10:
+        x, y, w, h = face_rect
+        cx, cy = x + w // 2, y + h // 2
+        for track_data in self.tracked_faces.values():
+            tx, ty, tw, th = track_data['rectangle']
+            dx, dy = cx - (tx + tw // 2), cy - (ty + th // 2)
+            if dx * dx + dy * dy < 100:  # Within 10px center-to-center
                 return track_data['name'], track_data['confidence']
         return "Unknown", 0.0
     
+    def match_faces_to_track_ids(self, current_faces, max_distance=10):
+        """Find the nearest track ID for each face rectangle (None if no track is close enough)"""
+        if not current_faces or not self.tracked_faces:
+            return [None] * len(current_faces)
+        
+        track_ids = list(self.tracked_faces.keys())
+        faces = np.asarray(current_faces, dtype=np.int32).reshape(-1, 4)
+        tracks = np.asarray([self.tracked_faces[tid]['rectangle'] for tid in track_ids], dtype=np.int32).reshape(-1, 4)
+        
+        # Squared center-to-center distances for every face/track pair in one pass;
+        # comparing against max_distance squared gives the same matches without a sqrt
+        face_centers = faces[:, :2] + faces[:, 2:4] // 2
+        track_centers = tracks[:, :2] + tracks[:, 2:4] // 2
+        diff = face_centers[:, None, :] - track_centers[None, :, :]
+        distances_sq = (diff * diff).sum(axis=-1)
+        
+        best = distances_sq.argmin(axis=1)
+        matched = distances_sq[np.arange(len(faces)), best] < max_distance * max_distance
+        return [track_ids[b] if m else None for b, m in zip(best, matched)]
+    
     def draw_face_with_tracking(self, frame, x, y, w, h, name, confidence, track_id=None):
         """Draw face rectangle with tracking information"""
         # Choose color based on recognition confidence
         if name != "Unknown" and confidence > 0.7:
-            color = (0, 255, 0)  # Green for high confidence
+            color = GREEN  # Green for high confidence
         elif name != "Unknown" and confidence > 0.3:
-            color = (0, 255, 255)  # Yellow for medium confidence
+            color = YELLOW  # Yellow for medium confidence
         else:
-            color = (255, 0, 0)  # Blue for unknown/low confidence
+            color = BLUE  # Blue for unknown/low confidence
         
         # Draw rectangle
         cv2.rectangle(frame, (x, y), (x+w, y+h), color, 2)
         
         # Display name and confidence
         confidence_text = f"{round(confidence * 100)}%"
-        cv2.putText(frame, name, (x+5, y-5), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-        cv2.putText(frame, confidence_text, (x+5, y+h-5), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 1)
+        cv2.putText(frame, name, (x+5, y-5), FONT, 0.8, WHITE, 2)
+        cv2.putText(frame, confidence_text, (x+5, y+h-5), FONT, 0.6, CYAN, 1)
         
         # Display track ID if available
         if track_id is not None:
-            cv2.putText(frame, f"ID:{track_id}", (x+w-40, y-5), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 255), 1)
+            cv2.putText(frame, f"ID:{track_id}", (x+w-40, y-5), FONT, 0.5, MAGENTA, 1)
     
     def cleanup_camera(self):
         """Clean up camera resources"""
-        if self.camera is not None:
+        if self._grabber_thread is not None:
+            # The grabber owns the capture while it runs, so it does the release
+            self.stop_frame_grabber(release_camera=True)
+        elif self.camera is not None:
             self.camera.release()
         cv2.destroyAllWindows()
     
     def get_frame(self):
-        """Get current frame from camera"""
+        """Get the newest frame from the grabber thread (never blocks on the camera)"""
         if not self.camera:
             return None, None
         
         try:
-            ret, frame = self.camera.read()
-            if ret and frame is not None:
+            # Take the latest frame so the same frame is never returned twice
+            with self._frame_lock:
+                frame = self._latest_frame
+                self._latest_frame = None
+            ret = frame is not None
+            if ret:
                 # Apply dynamic frame rotation
                 rotation = camera_config.get("frame_rotation", "90_ccw")
                 if rotation == "90_ccw":
@@ -345,7 +539,8 @@ class CameraHandler:
             return False
         
         self.last_frame_time = current_time
-        self.frame_count += 1
+        with self._state_lock:
+            self.frame_count += 1
         return True
     
     def should_process_face_detection(self):
@@ -353,12 +548,8 @@ class CameraHandler:
         return self.frame_count % self.face_detection_interval == 0
     
     def cleanup_memory(self):
-        """Perform memory cleanup"""
-        cleanup_interval = camera_config.get("memory_cleanup_interval", 10)
-        if self.frame_count % cleanup_interval == 0:
-            gc.collect()
-            # Reset canvas size cache to handle window resizing
-            self.canvas_size = None 
+        """Perform memory cleanup (called on a coarse timer, not per frame)"""
+        gc.collect()
 
     def apply_config_changes(self):
         """Apply configuration changes and restart camera if needed"""
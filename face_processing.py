@@ -5,6 +5,7 @@ from PIL import Image
 from sklearn.metrics.pairwise import cosine_similarity
 import pickle
 import os
+import threading
 import time
 from camera_config import camera_config
 
@@ -18,14 +19,44 @@ except ImportError:
     FACENET_AVAILABLE = False
     print("FaceNet not available. Install with: pip install facenet-pytorch torch scikit-learn")
 
+# Optional ONNX Runtime backend for int8-quantized CPU recognition
+ONNXRUNTIME_AVAILABLE = False
+try:
+    import onnxruntime as ort
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+# Maximum number of faces embedded per forward pass (size of the reusable batch tensor)
+MAX_BATCH_FACES = 8
+
+ONNX_MODEL_FILE = 'trainer/facenet.onnx'
+ONNX_INT8_MODEL_FILE = 'trainer/facenet_int8.onnx'
+
 class FaceProcessor:
     """Handles face detection, recognition, and embedding operations"""
     
     def __init__(self):
         self.mtcnn = None
         self.facenet_model = None
+        self.onnx_session = None
+        self.device = None
+        # Preprocessing buffers reused for every face crop
+        self._crop_buf = np.empty((320, 240, 3), dtype=np.uint8)
+        self._lab_buf = np.empty((320, 240, 3), dtype=np.uint8)
+        self._rgb_buf = np.empty((320, 240, 3), dtype=np.uint8)
+        self._clahe = cv2.createCLAHE(clipLimit=2.0)
+        self._batch_tensor = None
+        # Held while the buffers above are filled and run; the video worker and
+        # training on the Tk thread both extract embeddings
+        self._buffers_lock = threading.Lock()
         self.face_embeddings = {}
         self.embedding_cache = {}
+        # (row-normalized matrix of all stored embeddings, owner name of each row),
+        # published as one tuple so the recognition worker never pairs a new matrix
+        # with an old names list
+        self._emb_index = (np.empty((0, 512), dtype=np.float32), [])
      
         
     def initialize_face_recognition_optimized(self):
@@ -38,6 +69,11 @@ class FaceProcessor:
             use_gpu = camera_config.get("enable_gpu", True)
             device = torch.device('cuda' if (torch.cuda.is_available() and use_gpu) else 'cpu')
             print(f"Using device: {device}")
+            self.device = device
+            
+            # Reusable batch tensor for aligned faces (pinned for faster host-to-GPU copies)
+            self._batch_tensor = torch.empty((MAX_BATCH_FACES, 3, 160, 160), dtype=torch.float32,
+                                             pin_memory=(device.type == 'cuda'))
             
             # Dynamic MTCNN settings
             mtcnn_config = camera_config.get_mtcnn_config()
@@ -55,6 +91,10 @@ class FaceProcessor:
             # Initialize FaceNet model
             self.facenet_model = InceptionResnetV1(pretrained='vggface2').eval().to(device)
             
+            # Optionally run recognition through an int8 ONNX Runtime model on CPU
+            if camera_config.get("recognition_backend", "torch") == "onnx_int8" and device.type == 'cpu':
+                self.onnx_session = self.load_onnx_int8_session()
+            
             self.load_face_embeddings()
             print(f"✅ FaceNet initialized: Device={device}, Min Face Size={mtcnn_config['min_face_size']}")
             return True
@@ -63,15 +103,46 @@ class FaceProcessor:
             print(f"❌ Failed to initialize FaceNet: {e}")
             return False
     
+    def load_onnx_int8_session(self):
+        """Export FaceNet to ONNX once, quantize weights to int8 and open a CPU session"""
+        if not ONNXRUNTIME_AVAILABLE:
+            print("ONNX Runtime not available, using torch for recognition. Install with: pip install onnxruntime")
+            return None
+        
+        try:
+            if not os.path.exists(ONNX_INT8_MODEL_FILE):
+                os.makedirs('trainer', exist_ok=True)
+                dummy = torch.randn(1, 3, 160, 160)
+                torch.onnx.export(self.facenet_model.cpu(), dummy, ONNX_MODEL_FILE,
+                                  input_names=['input'], output_names=['embedding'],
+                                  dynamic_axes={'input': {0: 'batch'}, 'embedding': {0: 'batch'}},
+                                  opset_version=17)
+                quantize_dynamic(ONNX_MODEL_FILE, ONNX_INT8_MODEL_FILE, weight_type=QuantType.QUInt8)
+                print(f"Exported int8 FaceNet model to {ONNX_INT8_MODEL_FILE}")
+            
+            session = ort.InferenceSession(ONNX_INT8_MODEL_FILE, providers=['CPUExecutionProvider'])
+            print("✅ Using int8 ONNX Runtime model for recognition")
+            return session
+            
+        except Exception as e:
+            print(f"❌ Failed to load int8 ONNX model, using torch for recognition: {e}")
+            return None
+    
     def detect_faces_optimized(self, frame):
         """Optimized face detection with MTCNN"""
         try:
             if not self.mtcnn:
                 return []
             
-            # Dynamic scale factor for faster processing
+            # Detect on a downscaled copy - MTCNN cost grows with pixel count.
+            # A scale factor of 1.0 opts out for scenes with small, far-away faces.
             scale_factor = camera_config.get("detection_scale_factor", 0.5)
-            small_frame = cv2.resize(frame, (0, 0), fx=scale_factor, fy=scale_factor)
+            if 0 < scale_factor < 1.0:
+                small_frame = cv2.resize(frame, (0, 0), fx=scale_factor, fy=scale_factor,
+                                         interpolation=cv2.INTER_AREA)
+            else:
+                scale_factor = 1.0
+                small_frame = frame
             
             # Convert to PIL
             frame_rgb = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
@@ -114,106 +185,176 @@ class FaceProcessor:
     
     def process_face_recognition_optimized(self, frame, x, y, w, h):
         """Optimized face recognition processing - returns (name, confidence)"""
+        return self.process_face_recognition_batch(frame, [(x, y, w, h)])[0]
+    
+    def process_face_recognition_batch(self, frame, boxes):
+        """Recognize all faces of a frame with a single FaceNet forward pass - returns [(name, confidence)]"""
+        results = [("Unknown", 0.0)] * len(boxes)
         try:
-            face_roi = frame[y:y+h, x:x+w]
-            if face_roi.size == 0:
-                return "Unknown", 0.0
-            
-            # Generate cache key
-            cache_key = hash(face_roi.tobytes())
+            embeddings = [None] * len(boxes)
+            pending = []  # (index, cache_key, face_roi) for crops not in the cache
             
-            # Check embedding cache
-            if cache_key in self.embedding_cache:
-                face_embedding = self.embedding_cache[cache_key]
-            else:
-                face_embedding = self.get_face_embedding_optimized(face_roi)
-                if face_embedding is not None:
+            for i, (x, y, w, h) in enumerate(boxes):
+                face_roi = frame[y:y+h, x:x+w]
+                if face_roi.size == 0:
+                    continue
+                
+                # Check embedding cache
+                cache_key = hash(face_roi.tobytes())
+                if cache_key in self.embedding_cache:
+                    embeddings[i] = self.embedding_cache[cache_key]
+                else:
+                    pending.append((i, cache_key, face_roi))
+            
+            if pending:
+                new_embeddings = self.get_face_embeddings_batch([roi for _, _, roi in pending])
+                max_cache_size = camera_config.get("embedding_cache_size", 100)
+                for (i, cache_key, _), face_embedding in zip(pending, new_embeddings):
+                    if face_embedding is None:
+                        continue
+                    embeddings[i] = face_embedding
                     self.embedding_cache[cache_key] = face_embedding
                     # Limit cache size
-                    max_cache_size = camera_config.get("embedding_cache_size", 100)
                     if len(self.embedding_cache) > max_cache_size:
                         self.embedding_cache.pop(next(iter(self.embedding_cache)))
             
-            if face_embedding is not None:
-                name, similarity = self.recognize_face_embedding_optimized(face_embedding)
-                return name, similarity
-            else:
-                return "Unknown", 0.0
-                    
+            # Match all embeddings against the database in one matrix product
+            known = [i for i, face_embedding in enumerate(embeddings) if face_embedding is not None]
+            matches = self.recognize_face_embeddings_batch([embeddings[i] for i in known])
+            for i, match in zip(known, matches):
+                results[i] = match
+            
+            return results
+            
         except Exception as e:
-            print(f"Recognition error: {e}")
-            return "Unknown", 0.0
+            print(f"Batch recognition error: {e}")
+            return results
     
-    def get_face_embedding_optimized(self, face_image):
-        """Optimized face embedding extraction"""
+    def preprocess_face_tensor(self, face_image):
+        """Enhance and align a face crop - returns a (3, 160, 160) tensor or None"""
+        # The buffers are 3-channel BGR; other crops would make OpenCV allocate
+        # a new array and leave stale pixels in the buffer
+        if face_image.ndim == 2:
+            face_image = cv2.cvtColor(face_image, cv2.COLOR_GRAY2BGR)
+        elif face_image.shape[2] == 4:
+            face_image = cv2.cvtColor(face_image, cv2.COLOR_BGRA2BGR)
+        
+        # Enhanced preprocessing, written into preallocated buffers
+        face_resized = cv2.resize(face_image, (240, 320), dst=self._crop_buf, interpolation=cv2.INTER_LANCZOS4)
+        
+        # Apply histogram equalization for better quality
+        cv2.cvtColor(face_resized, cv2.COLOR_BGR2LAB, dst=self._lab_buf)
+        self._lab_buf[:,:,0] = self._clahe.apply(self._lab_buf[:,:,0])
+        cv2.cvtColor(self._lab_buf, cv2.COLOR_LAB2RGB, dst=self._rgb_buf)
+        
+        face_pil = Image.fromarray(self._rgb_buf)
+        
+        # Get aligned face
+        if self.mtcnn is None:
+            return None
+        face_tensor = self.mtcnn(face_pil)
+        if face_tensor is not None and face_tensor.dim() == 4:
+            face_tensor = face_tensor[0]
+        return face_tensor
+    
+    def get_face_embeddings_batch(self, face_images):
+        """Extract embeddings for several face crops in one forward pass"""
+        embeddings = [None] * len(face_images)
         try:
             if not self.facenet_model:
-                return None
-            
-            # Enhanced preprocessing
-            face_resized = cv2.resize(face_image, (240, 320), interpolation=cv2.INTER_LANCZOS4)
-            
-            # Apply histogram equalization for better quality
-            if len(face_resized.shape) == 3:
-                lab = cv2.cvtColor(face_resized, cv2.COLOR_BGR2LAB)
-                lab[:,:,0] = cv2.createCLAHE(clipLimit=2.0).apply(lab[:,:,0])
-                face_resized = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
-            
-            face_rgb = cv2.cvtColor(face_resized, cv2.COLOR_BGR2RGB)
-            face_pil = Image.fromarray(face_rgb)
-            
-            # Get aligned face
-            face_tensor = None
-            if self.mtcnn is not None:
-                face_tensor = self.mtcnn(face_pil)
-            
-            if face_tensor is not None:
-                if face_tensor.dim() == 3:
-                    face_tensor = face_tensor.unsqueeze(0)
+                return embeddings
+            
+            with self._buffers_lock:
+                aligned = []  # (index, tensor)
+                for i, face_image in enumerate(face_images):
+                    face_tensor = self.preprocess_face_tensor(face_image)
+                    if face_tensor is not None:
+                        aligned.append((i, face_tensor))
                 
-                with torch.no_grad():
-                    embedding = self.facenet_model(face_tensor).cpu().numpy()
-                return embedding.flatten()
-            
-            return None
+                if not aligned:
+                    return embeddings
+                
+                if self._batch_tensor is None:
+                    self._batch_tensor = torch.empty((MAX_BATCH_FACES, 3, 160, 160), dtype=torch.float32)
+                
+                for start in range(0, len(aligned), MAX_BATCH_FACES):
+                    chunk = aligned[start:start + MAX_BATCH_FACES]
+                
+                    # Copy aligned faces into the reusable batch tensor
+                    for k, (_, face_tensor) in enumerate(chunk):
+                        self._batch_tensor[k].copy_(face_tensor)
+                    batch = self._batch_tensor[:len(chunk)]
+                
+                    # Read once: the settings dialog may swap the backend while this runs
+                    onnx_session = self.onnx_session
+                    if onnx_session is not None:
+                        batch_embeddings = onnx_session.run(None, {'input': batch.numpy()})[0]
+                    else:
+                        if self.device is not None:
+                            batch = batch.to(self.device, non_blocking=True)
+                        with torch.no_grad():
+                            batch_embeddings = self.facenet_model(batch).cpu().numpy()
+                
+                    for (i, _), embedding in zip(chunk, batch_embeddings):
+                        embeddings[i] = embedding.flatten()
+            return embeddings
             
         except Exception as e:
-            print(f"Embedding error: {e}")
-            return None
+            print(f"Batch embedding error: {e}")
+            return embeddings
     
-    def recognize_face_embedding_optimized(self, face_embedding, threshold=None):
-        """Optimized face recognition with vectorized operations"""
+    def get_face_embedding_optimized(self, face_image):
+        """Optimized face embedding extraction"""
+        return self.get_face_embeddings_batch([face_image])[0]
+    
+    def rebuild_embedding_matrix(self):
+        """Rebuild the contiguous embedding matrix from face_embeddings"""
+        names = []
+        rows = []
+        for name, stored_embeddings in self.face_embeddings.items():
+            for embedding in stored_embeddings:
+                names.append(name)
+                rows.append(embedding)
+        
+        if rows:
+            matrix = np.ascontiguousarray(rows, dtype=np.float32)
+            matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        else:
+            matrix = np.empty((0, 512), dtype=np.float32)
+        
+        self._emb_index = (matrix, names)
+    
+    def recognize_face_embeddings_batch(self, face_embeddings, threshold=None):
+        """Match several embeddings against all stored embeddings with one matrix product"""
         try:
-            if face_embedding is None or not self.face_embeddings:
-                return "Unknown", 0
+            # Read the index once so a concurrent rebuild can't change it mid-batch
+            emb_matrix, emb_names = self._emb_index
+            if not face_embeddings or len(emb_names) == 0:
+                return [("Unknown", 0)] * len(face_embeddings)
             
             # Use dynamic recognition threshold if not provided
             if threshold is None:
                 threshold = camera_config.get("recognition_threshold", 0.7)
             
-            best_match = "Unknown"
-            best_similarity = 0
+            queries = np.asarray(face_embeddings, dtype=np.float32)
+            queries /= np.linalg.norm(queries, axis=1, keepdims=True)
             
-            face_embedding_normalized = face_embedding / np.linalg.norm(face_embedding)
+            similarities = queries @ emb_matrix.T
+            best_rows = similarities.argmax(axis=1)
+            best_similarities = similarities[np.arange(len(queries)), best_rows]
             
-            for name, stored_embeddings in self.face_embeddings.items():
-                if stored_embeddings:
-                    # Vectorized similarity calculation
-                    embeddings_array = np.array(stored_embeddings)
-                    embeddings_normalized = embeddings_array / np.linalg.norm(embeddings_array, axis=1, keepdims=True)
-                    
-                    similarities = np.dot(embeddings_normalized, face_embedding_normalized)
-                    max_similarity = np.max(similarities)
-                    
-                    if max_similarity > best_similarity:
-                        best_similarity = max_similarity
-                        best_match = name
-            
-            return (best_match, best_similarity) if best_similarity > threshold else ("Unknown", best_similarity)
+            return [(emb_names[row], similarity) if similarity > threshold else ("Unknown", similarity)
+                    for row, similarity in zip(best_rows, best_similarities)]
             
         except Exception as e:
             print(f"Recognition error: {e}")
+            return [("Unknown", 0)] * len(face_embeddings)
+    
+    def recognize_face_embedding_optimized(self, face_embedding, threshold=None):
+        """Optimized face recognition with vectorized operations"""
+        if face_embedding is None:
             return "Unknown", 0
+        return self.recognize_face_embeddings_batch([face_embedding], threshold)[0]
     
     def load_face_embeddings(self):
         """Load face embeddings efficiently"""
@@ -229,9 +370,11 @@ class FaceProcessor:
         except Exception as e:
             print(f"Error loading face embeddings: {e}")
             self.face_embeddings = {}
+        self.rebuild_embedding_matrix()
     
     def save_face_embeddings(self):
         """Save face embeddings efficiently"""
+        self.rebuild_embedding_matrix()
         try:
             os.makedirs('trainer', exist_ok=True)
             with open('trainer/face_embeddings.pkl', 'wb') as f:
@@ -313,6 +456,16 @@ class FaceProcessor:
                     print(f"❌ Failed to update MTCNN: {e}")
                     return False
             
+            # Switch the recognition backend (int8 ONNX only runs on CPU)
+            if self.facenet_model is not None:
+                use_onnx = (camera_config.get("recognition_backend", "torch") == "onnx_int8"
+                            and self.device is not None and self.device.type == 'cpu')
+                if use_onnx and self.onnx_session is None:
+                    self.onnx_session = self.load_onnx_int8_session()
+                elif not use_onnx and self.onnx_session is not None:
+                    self.onnx_session = None
+                    print("✅ Using torch for recognition")
+            
             # Clear embedding cache to apply new cache size
             max_cache_size = camera_config.get("embedding_cache_size", 100)
             if len(self.embedding_cache) > max_cache_size:
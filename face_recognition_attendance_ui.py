@@ -4,17 +4,18 @@ Enhanced performance with better memory management and streamlined processing
 Uses FaceNet (MTCNN + InceptionResnetV1) for face detection and recognition
 '''
 
-import cv2
+import logging
 import numpy as np
 import os
+import queue
 import threading
 import time
+from contextlib import contextmanager
 import tkinter as tk
 from tkinter import ttk, simpledialog
 from PIL import Image, ImageTk
 from typing import Optional
 from datetime import datetime
-import gc
 
 # Import custom modules
 from ui_dialogs import CustomDialog
@@ -51,6 +52,7 @@ class OptimizedFaceRecognitionAttendanceUI:
         self.training_manager = TrainingManager()
         self.attendance_manager = AttendanceManager()
         self.file_manager = FileManager(self.camera_handler)
+        self.file_manager.app_instance = self  # Lets saved settings reach running components
         self.menu_manager = MenuManager()
       
         # Core variables
@@ -58,12 +60,18 @@ class OptimizedFaceRecognitionAttendanceUI:
         self.is_training = False
         self.progress_var = tk.DoubleVar()
         
+        # Detection/recognition worker publishes its latest result through a single-slot queue
+        self._result_q = queue.Queue(maxsize=1)
+        self._stop_worker = threading.Event()
+        self._worker_thread = None
+        
         # Initialize system2
         self.initialize_system()
         
         # Start main processes
         self.start_camera_optimized()
         self.start_video_loop()
+        self.root.after(camera_config.get("memory_cleanup_interval", 30) * 1000, self.schedule_memory_cleanup)
     
     def setup_window(self):
         """Optimized window setup"""
@@ -71,23 +79,6 @@ class OptimizedFaceRecognitionAttendanceUI:
         self.root.attributes('-fullscreen', True)
         self.root.configure(bg='#2c3e50')
         self.root.bind('<Escape>', lambda e: self.cleanup_and_exit())
-        def record_touch(event):
-            """Function to be called when a touch/click occurs."""
-            self.root.x, self.root.y = event.x, event.y
-            if self.root.x != event.x and self.root.y != event.y:
-                self.root.event_generate('<Motion>', x=self.root.x, y=self.root.y, warp=True)
-                
-            #else:
-                #print(f"touch at {self.root.x}, {self.root.y}")
-           #print(f"touch at {self.root.x}, {self.root.y}")
-   
-        def callback(e):
-            x, y = e.x, e.y
-            #print(f"Pointer is currently at {x}, {y}")   
-
-        self.root.bind("<Button-1>", record_touch)
-        self.root.bind('<Motion>', callback)
-        
         
         # Cache screen dimensions
         self.screen_width = self.root.winfo_screenwidth()
@@ -120,6 +111,8 @@ class OptimizedFaceRecognitionAttendanceUI:
         # Main canvas for video
         self.canvas = tk.Canvas(self.video_frame, bg='black', highlightthickness=1, highlightcolor='#7f8c8d')
         self.canvas.place(x=0, y=155,relwidth=1, relheight=1,anchor=tk.NW)
+        # Recompute the display size only when the canvas is actually resized
+        self.canvas.bind('<Configure>', lambda e: setattr(self.camera_handler, 'canvas_size', None))
        
         # Separator line
         separator = tk.Frame(main_frame, bg='#7f8c8d', height=2)
@@ -271,90 +264,114 @@ class OptimizedFaceRecognitionAttendanceUI:
             CustomDialog.show_error(self.root, "Error", "Could not open camera")
     
     def start_video_loop(self):
-        """Start optimized video processing loop"""
+        """Start the processing worker and the UI display loop"""
+        if self.camera_handler.camera and self._worker_thread is None:
+            self._worker_thread = threading.Thread(target=self.video_worker, daemon=True)
+            self._worker_thread.start()
         self.update_video_optimized()
     
+    def video_worker(self):
+        """Capture, detect and recognize faces off the Tk main thread"""
+        while not self._stop_worker.is_set():
+            # Frame rate control
+            if not self.camera_handler.is_time_for_next_frame():
+                time.sleep(0.005)
+                continue
+            
+            try:
+                ret, frame = self.camera_handler.get_frame()
+                if not ret or frame is None:
+                    # No new frame from the grabber yet
+                    time.sleep(0.005)
+                    continue
+                
+                faces = []
+                results = None
+                
+                # Skip inference while paused (during training or menu)
+                if not self.camera_handler.video_paused:
+                    # Optimized face detection with caching
+                    faces = self.camera_handler.get_cached_faces(frame, self.face_processor)
+                    
+                    # Face recognition (process less frequently), batched over all faces
+                    if (faces and not self.is_capturing and
+                            self.camera_handler.frame_count % self.camera_handler.recognition_interval == 0):
+                        results = self.face_processor.process_face_recognition_batch(frame, faces)
+                
+                # Overwrite any result the UI hasn't picked up yet
+                try:
+                    self._result_q.get_nowait()
+                except queue.Empty:
+                    pass
+                self._result_q.put_nowait((frame, faces, results))
+                
+            except Exception as e:
+                print(f"Video worker error: {e}")
+    
     def update_video_optimized(self):
-        """Optimized video processing with better performance"""
+        """Display the latest worker result - UI-only work on the Tk main thread"""
         if not self.camera_handler.camera:
             return
         
-        # Frame rate control
-        if not self.camera_handler.is_time_for_next_frame():
-            self.root.after(5, self.update_video_optimized)
+        try:
+            frame, faces, results = self._result_q.get_nowait()
+        except queue.Empty:
+            self.root.after(16, self.update_video_optimized)
             return
         
         try:
-            ret, frame = self.camera_handler.get_frame()
-            if not ret or frame is None:
-                self.root.after(self.camera_handler.frame_interval, self.update_video_optimized)
-                return
-            
             # Check if video is paused (during training or menu)
             if self.camera_handler.video_paused:
-                # Display the last frame without processing new faces
-                if hasattr(self.camera_handler, 'last_display_frame') and self.camera_handler.last_display_frame is not None:
-                    paused_frame = self.camera_handler.last_display_frame.copy()
-                    cv2.putText(paused_frame, "Please wait...", 
-                               (150, 150), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-                    self.camera_handler.display_frame_optimized(paused_frame, self.canvas, self.root)
-                else:
-                    paused_frame = frame.copy()
-                    cv2.putText(paused_frame, "Please wait...", 
-                               (150, 150), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-                    self.camera_handler.display_frame_optimized(paused_frame, self.canvas, self.root)
-                    
-                self.root.after(self.camera_handler.frame_interval, self.update_video_optimized)
+                # Display the cached annotated frame without processing new faces
+                paused_frame = self.camera_handler.get_paused_overlay(frame)
+                self.camera_handler.display_frame_optimized(paused_frame, self.canvas, self.root)
+                
+                # Nothing changes while paused, so poll less often
+                self.root.after(100, self.update_video_optimized)
                 return
             
-            # Store frame for pause display
-     
-            self.camera_handler.last_display_frame = frame.copy()
-            
-            # Optimized face detection with caching
-            faces = self.camera_handler.get_cached_faces(frame, self.face_processor)
+            # Keep the clean captured frame for pause display and checkout photos.
+            # Every worker result is a fresh array, so a reference is enough.
+            self.camera_handler.last_display_frame = frame
             
-            # Process faces efficiently
+            # Process faces efficiently; boxes and names are drawn on a copy so
+            # the kept frame stays clean, and frames without faces skip the copy
             if faces:
-                self.process_faces_optimized(frame, faces)
+                frame = frame.copy()
+                self.process_faces_optimized(frame, faces, results)
             
             # Display frame
             self.camera_handler.display_frame_optimized(frame, self.canvas, self.root)
             
         except Exception as e:
             print(f"Video update error: {e}")
-        finally:
-            # Memory cleanup
-            self.camera_handler.cleanup_memory()
         
-        self.root.after(self.camera_handler.frame_interval, self.update_video_optimized)
+        self.root.after(16, self.update_video_optimized)
     
-    def process_faces_optimized(self, frame, faces):
-        """Optimized face processing with tracking"""
-        current_faces = []
+    def schedule_memory_cleanup(self):
+        """Run memory cleanup on a coarse timer instead of from the video loop"""
+        self.camera_handler.cleanup_memory()
+        cleanup_interval = camera_config.get("memory_cleanup_interval", 30)
+        self.root.after(cleanup_interval * 1000, self.schedule_memory_cleanup)
+    
+    def process_faces_optimized(self, frame, faces, results=None):
+        """Optimized face processing with tracking - results come from the worker on recognition frames"""
+        current_faces = list(faces)
         face_names = []
-
-        # Process each face
-        for i, (x, y, w, h) in enumerate(faces):
-            if self.is_capturing and self.training_manager.capture_count < self.training_manager.max_captures:
-                self.progress_var.set(self.training_manager.capture_count)
-                if self.training_manager.capture_face_optimized(frame, x, y, w, h):
-                    self.stop_capture()
-
-                return
-                
-            
-            # Face recognition (process less frequently)
-            name = "Unknown"
-            confidence = 0.0
-            
-            recognition_interval = camera_config.get("recognition_interval", 3)
-            if self.camera_handler.frame_count % recognition_interval == 0:
-                name, confidence = self.face_processor.process_face_recognition_optimized(frame, x, y, w, h)
-            else:
-                # Use tracking information for non-recognition frames
-                name, confidence = self.camera_handler.get_tracked_face_info((x, y, w, h))
-            
+        
+        # Capture for training
+        if self.is_capturing and self.training_manager.capture_count < self.training_manager.max_captures:
+            x, y, w, h = faces[0]
+            self.progress_var.set(self.training_manager.capture_count)
+            if self.training_manager.capture_face_optimized(frame, x, y, w, h):
+                self.stop_capture()
+            return
+        
+        if results is None:
+            # Use tracking information for non-recognition frames
+            results = [self.camera_handler.get_tracked_face_info(face) for face in faces]
+        
+        for name, confidence in results:
             face_names.append(name)
             
             # Handle attendance for recognized faces
@@ -363,26 +380,24 @@ class OptimizedFaceRecognitionAttendanceUI:
                     # Save check-in photo
                     self.training_manager.save_checkin_photo(name, frame)
                     self.attendance_manager.update_last_checkin_display(name, self.checkin_textbox)
-            
-            # Capture for training
-           
-        current_faces.append((x, y, w, h))
+        
         # Update face tracking first
         self.camera_handler.update_face_tracking(current_faces, face_names)
         
+        # Find corresponding track IDs for all faces at once
+        track_ids = self.camera_handler.match_faces_to_track_ids(current_faces)
+        
         # Draw faces with tracking information
         for i, (x, y, w, h) in enumerate(current_faces):
             name = face_names[i]
             confidence = 0.0
-            track_id = None
+            track_id = track_ids[i]
             
-            # Find corresponding track ID and get updated info
-            for tid, track_data in self.camera_handler.tracked_faces.items():
-                if self.camera_handler.calculate_rectangle_distance((x, y, w, h), track_data['rectangle']) < 10:
-                    name = track_data['name']
-                    confidence = track_data['confidence']
-                    track_id = tid
-                    break
+            # Get updated info from the matched track
+            if track_id is not None:
+                track_data = self.camera_handler.tracked_faces[track_id]
+                name = track_data['name']
+                confidence = track_data['confidence']
             
             # Draw face with tracking info
             self.camera_handler.draw_face_with_tracking(frame, x, y, w, h, name, confidence, track_id)
@@ -526,6 +541,27 @@ class OptimizedFaceRecognitionAttendanceUI:
         
         last_employee = self.attendance_manager.last_recognized_employee
         
+        # Keep the worker idle while the modal dialogs are open
+        with self.pause_video_processing():
+            self.confirm_and_check_out(last_employee)
+    
+    @contextmanager
+    def pause_video_processing(self):
+        """Pause face processing for the duration of a modal dialog"""
+        was_paused = self.camera_handler.video_paused
+        self.camera_handler.video_paused = True
+        try:
+            yield
+        finally:
+            self.camera_handler.video_paused = was_paused
+            # Drop the result produced before/while paused so no stale frame is processed
+            try:
+                self._result_q.get_nowait()
+            except queue.Empty:
+                pass
+    
+    def confirm_and_check_out(self, last_employee):
+        """Confirm and record the check out of the given employee"""
         # Confirm checkout
         result = CustomDialog.ask_yes_no(self.root, "Confirm Check Out", 
                                        f"Check out {last_employee}?\n\n"
@@ -538,7 +574,7 @@ class OptimizedFaceRecognitionAttendanceUI:
         if self.attendance_manager.handle_checkout_optimized(last_employee):
             # Save check-out photo if we have a current frame
             if hasattr(self.camera_handler, 'last_display_frame') and self.camera_handler.last_display_frame is not None:
-                self.training_manager.save_checkout_photo(last_employee, self.camera_handler.last_display_frame)
+                self.training_manager.save_checkout_photo(last_employee, self.camera_handler.last_display_frame.copy())
             
             # Update the display to show checkout
             self.update_checkout_display(last_employee)
@@ -560,33 +596,28 @@ class OptimizedFaceRecognitionAttendanceUI:
         """Update the check-in history to show checkout"""
         checkout_time = datetime.now().strftime("%H:%M:%S")
         
-        # Enable text editing
-        self.checkin_textbox.config(state=tk.NORMAL)
-        
         # Add checkout entry with timestamp and name
-        entry = f"🔓 {name} - {checkout_time} (CHECKOUT)\n"
-        self.checkin_textbox.insert(tk.END, entry)
-        
-        # Auto-scroll to the bottom to show the latest entry
-        self.checkin_textbox.see(tk.END)
-        
-        # Disable text editing to prevent user modification
-        self.checkin_textbox.config(state=tk.DISABLED)
+        self.attendance_manager.append_history_entry(self.checkin_textbox, f"🔓 {name} - {checkout_time} (CHECKOUT)\n")
 
     def cleanup_and_exit(self):
         """Clean up resources and exit"""
+        self._stop_worker.set()
+        if self._worker_thread is not None:
+            self._worker_thread.join(timeout=1.0)
         self.camera_handler.cleanup_camera()
         self.attendance_manager.cleanup_database()
         self.root.destroy()
     
     def update_time_display(self):
         """Update the current time display"""
-        current_time = datetime.now().strftime("%Y-%m-%d  %H:%M:%S")
-        self.camera_handler.time_label=current_time
-        # Update every second
-        self.root.after(1000, self.update_time_display)
+        now = datetime.now()
+        self.camera_handler.time_label = now.strftime("%Y-%m-%d  %H:%M")
+        # Update exactly on the next minute boundary
+        self.root.after((60 - now.second) * 1000 - now.microsecond // 1000, self.update_time_display)
 
 def main():
+    # Module loggers (file_manager, menu_ui) report at INFO; DEBUG traces stay off
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
     root = tk.Tk()
     app = OptimizedFaceRecognitionAttendanceUI(root)
  
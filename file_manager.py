@@ -1,26 +1,165 @@
 import os
-import shutil
+import logging
+import glob
+from concurrent.futures import ThreadPoolExecutor
+import time
 import tkinter as tk
+from datetime import date
 from tkinter import ttk
 from typing import Optional, TYPE_CHECKING, Any
 from ui_dialogs import CustomDialog
-from camera_config import camera_config
+from attendance_database import AttendanceDatabase
+from camera_config import camera_config, CONFIG_RANGES
+
+log = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
     from face_recognition_attendance_ui import OptimizedFaceRecognitionAttendanceUI
 
+DB_FILE = "attendance.db"
+
+# Seconds the database settings dialog reuses its counts
+DB_STATS_TTL = 5
+
+# Settings read by FaceProcessor.apply_config_changes
+FACE_PROCESSOR_KEYS = frozenset({
+    "min_face_size", "mtcnn_threshold_1", "mtcnn_threshold_2", "mtcnn_threshold_3",
+    "enable_gpu", "embedding_cache_size", "recognition_backend",
+})
+
+# Milliseconds between checks for a finished background config save
+SAVE_POLL_MS = 50
+
+RECOGNITION_SETTINGS_TEXT = """Face Recognition Settings:
+
+• Model: FaceNet (MTCNN + InceptionResnetV1)
+• Detection Threshold: 0.8
+• Recognition Threshold: 0.7
+• Face Detection Interval: Every 5th frame
+• Recognition Cooldown: 1 second
+
+To modify recognition settings, edit the relevant methods."""
+
+# Field declarations for each settings tab: (key, label, input type, constraints)
+CAMERA_HARDWARE_SETTINGS = [
+    ("camera_index", "Camera Index", "int", (0, 5)),
+    ("frame_width", "Frame Width", "int", (160, 1920)),
+    ("frame_height", "Frame Height", "int", (120, 1080)),
+    ("target_fps", "Target FPS", "int", (1, 60)),
+    ("buffer_size", "Buffer Size", "int", (1, 10)),
+    ("auto_exposure", "Auto Exposure", "float", (0.0, 1.0)),
+    ("brightness", "Brightness", "int", (-100, 100)),
+    ("contrast", "Contrast", "int", (-100, 100)),
+    ("saturation", "Saturation", "int", (-100, 100)),
+    ("gain", "Gain", "int", (0, 100)),
+]
+
+VIDEO_PROCESSING_SETTINGS = [
+    ("face_detection_interval", "Face Detection Interval", "int", (1, 30)),
+    ("face_cache_size", "Face Cache Size", "int", (1, 50)),
+    ("frame_rotation", "Frame Rotation", "choice", ["90_ccw", "90_cw", "180", "none"]),
+    ("flip_horizontal", "Flip Horizontal (Mirror)", "bool", None),
+    ("flip_vertical", "Flip Vertical", "bool", None),
+    ("memory_cleanup_interval", "Memory Cleanup Interval (s)", "int", (5, 300)),
+]
+
+FACE_DETECTION_SETTINGS = [
+    ("min_face_size", "Min Face Size", "int", (10, 320)),
+    ("detection_scale_factor", "Detection Scale Factor", "float", (0.1, 1.0)),
+    ("mtcnn_threshold_1", "MTCNN Threshold 1", "float", (0.1, 1.0)),
+    ("mtcnn_threshold_2", "MTCNN Threshold 2", "float", (0.1, 1.0)),
+    ("mtcnn_threshold_3", "MTCNN Threshold 3", "float", (0.1, 1.0)),
+    ("detection_confidence_threshold", "Detection Confidence", "float", (0.1, 1.0)),
+    ("min_face_region_size", "Min Face Region Size", "int", (10, 100)),
+]
+
+FACE_RECOGNITION_SETTINGS = [
+    ("recognition_threshold", "Recognition Threshold", "float", (0.1, 1.0)),
+    ("recognition_interval", "Recognition Interval", "int", (1, 10)),
+    ("embedding_cache_size", "Embedding Cache Size", "int", (10, 500)),
+    ("recognition_backend", "Recognition Backend", "choice", ["torch", "onnx_int8"]),
+    ("confidence_boost_factor", "Confidence Boost Factor", "float", (0.01, 0.5)),
+    ("confidence_decay_factor", "Confidence Decay Factor", "float", (0.01, 0.5)),
+]
+
+PERFORMANCE_SETTINGS = [
+    ("enable_gpu", "Enable GPU", "bool", None),
+    ("image_quality", "Image Quality", "choice", ["low", "medium", "high"]),
+    ("tracking_enabled", "Face Tracking", "bool", None),
+    ("max_track_distance", "Max Track Distance", "int", (10, 200)),
+    ("track_timeout", "Track Timeout", "int", (5, 100)),
+]
+
+def silent_unlink(path):
+    """Remove a file, ignoring it if it is already gone; returns True if it was removed"""
+    try:
+        os.unlink(path)
+        return True
+    except FileNotFoundError:
+        return False
+
 class FileManager:
     """Handles file operations and data management"""
     
     def __init__(self,camera_handler):
         self.app_instance: Optional['OptimizedFaceRecognitionAttendanceUI'] = None
         self.camera_handler = camera_handler
+        self._db_stats = None
+        self._db_stats_time = 0.0
+        self._save_executor = ThreadPoolExecutor(max_workers=1)
+        # Snapshot of the values the running components were built with
+        self._last_applied_config = dict(camera_config.config)
 
     
     def create_directories(self):
         """Create necessary directories"""
+        # One directory listing instead of a failing mkdir per existing folder
+        with os.scandir('.') as entries:
+            existing = {entry.name for entry in entries if entry.is_dir()}
         for directory in ['dataset', 'trainer', 'CheckinPhoto', 'CheckoutPhoto']:
-            os.makedirs(directory, exist_ok=True)
+            if directory not in existing:
+                os.makedirs(directory, exist_ok=True)
+    
+    def clear_directory(self, path):
+        """Delete everything under path in a single pass and return the number of files removed"""
+        count = 0
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        count += self.clear_directory(entry.path)
+                        os.rmdir(entry.path)
+                    else:
+                        os.unlink(entry.path)
+                        count += 1
+                except OSError as e:
+                    log.warning("Error deleting %s: %s", entry.path, e)
+        return count
+    
+    def replace_database_file(self):
+        """Swap in a freshly initialized attendance.db, returning True if an old database was replaced"""
+        # A .new left by an interrupted reset still holds rows; CREATE TABLE IF NOT
+        # EXISTS would keep them, so start from no file at all
+        new_db_file = f"{DB_FILE}.new"
+        for path in (new_db_file, f"{new_db_file}-wal", f"{new_db_file}-shm"):
+            silent_unlink(path)
+        
+        # Build the empty schema beside the live file, then switch it in by rename
+        AttendanceDatabase(new_db_file)
+        old_db_file = f"{DB_FILE}.old"
+        try:
+            os.replace(DB_FILE, old_db_file)
+            db_existed = True
+        except FileNotFoundError:
+            db_existed = False
+        os.replace(new_db_file, DB_FILE)
+        silent_unlink(old_db_file)
+        
+        # Sidecars left by the old file must not be paired with the new one
+        for sidecar in glob.glob(f"{DB_FILE}-*"):
+            if silent_unlink(sidecar):
+                log.debug("Deleted database file: %s", sidecar)
+        return db_existed
     
     def reset_system(self, root, face_processor, attendance_manager, training_manager):
         """Reset system settings"""
@@ -42,48 +181,36 @@ class FileManager:
                 folders_to_clear = ['CheckinPhoto', 'CheckoutPhoto', 'dataset', 'trainer']
                 deleted_items = []
                 
-                for folder in folders_to_clear:
-                    if os.path.exists(folder):
-                        # Get count of items before deletion
-                        item_count = 0
-                        for root_dir, dirs, files in os.walk(folder):
-                            item_count += len(files)
-                        
-                        # Delete all contents
-                        for item in os.listdir(folder):
-                            item_path = os.path.join(folder, item)
-                            if os.path.isdir(item_path):
-                                shutil.rmtree(item_path)
-                            else:
-                                os.remove(item_path)
-                        
-                        if item_count > 0:
-                            deleted_items.append(f"{folder}: {item_count} items")
-                        print(f"Cleared {folder} folder ({item_count} items)")
-                
-                # Delete attendance database
-                if attendance_manager.attendance_db:
-                    try:
+                # The folder wipes and database unlinks are independent I/O, so overlap them
+                with ThreadPoolExecutor(max_workers=len(folders_to_clear) + 1) as executor:
+                    folder_futures = {folder: executor.submit(self.clear_directory, folder)
+                                      for folder in folders_to_clear}
+                    
+                    db_future = None
+                    if attendance_manager.attendance_db:
                         # Close database connection first
                         attendance_manager.attendance_db.close()
                         attendance_manager.attendance_db = None
-                        
-                        # Delete database file
-                        db_files = ["attendance.db", "attendance.db-journal", "attendance.db-wal", "attendance.db-shm"]
-                        db_deleted = False
-                        
-                        for db_file in db_files:
-                            if os.path.exists(db_file):
-                                os.remove(db_file)
-                                db_deleted = True
-                                print(f"Deleted database file: {db_file}")
-                        
-                        if db_deleted:
-                            deleted_items.append("Database: All attendance records")
-                            
-                    except Exception as db_error:
-                        print(f"Error deleting database: {db_error}")
-                        deleted_items.append("Database: Error deleting (may need manual cleanup)")
+                        self._db_stats = None
+                        db_future = executor.submit(self.replace_database_file)
+                    
+                    # Collect results in folder order so the summary is stable
+                    for folder, future in folder_futures.items():
+                        try:
+                            item_count = future.result()
+                        except FileNotFoundError:
+                            continue
+                        if item_count > 0:
+                            deleted_items.append(f"{folder}: {item_count} items")
+                        log.debug("Cleared %s folder (%d items)", folder, item_count)
+                    
+                    if db_future is not None:
+                        try:
+                            if db_future.result():
+                                deleted_items.append("Database: All attendance records")
+                        except Exception as db_error:
+                            log.error("Error deleting database: %s", db_error)
+                            deleted_items.append("Database: Error deleting (may need manual cleanup)")
                 
                 # Clear face embeddings
                 face_processor.face_embeddings = {}
@@ -109,12 +236,12 @@ class FileManager:
                                   f"Deleted items:\n{details}\n\n"
                                   f"System has been reloaded.")
                 
-                print("System reset completed successfully")
+                log.info("System reset completed successfully")
                 return True
                 
             except Exception as e:
                 CustomDialog.show_error(root, "Error", f"Failed to reset system: {e}")
-                print(f"Error during system reset: {e}")
+                log.error("Error during system reset: %s", e)
                 return False
         return False
     
@@ -150,40 +277,43 @@ class FileManager:
         
         # Storage for all settings
         self.settings_vars = {}
-        
-        # Camera Hardware Tab
-        camera_frame = tk.Frame(notebook, bg='#34495e')
-        notebook.add(camera_frame, text="Camera Hardware")
-        self.create_camera_hardware_settings(camera_frame)
-        
-        # Video Processing Tab
-        video_frame = tk.Frame(notebook, bg='#34495e')
-        notebook.add(video_frame, text="Video Processing")
-        self.create_video_processing_settings(video_frame)
-        
-        # Face Detection Tab
-        detection_frame = tk.Frame(notebook, bg='#34495e')
-        notebook.add(detection_frame, text="Face Detection")
-        self.create_face_detection_settings(detection_frame)
-        
-        # Face Recognition Tab
-        recognition_frame = tk.Frame(notebook, bg='#34495e')
-        notebook.add(recognition_frame, text="Face Recognition")
-        self.create_face_recognition_settings(recognition_frame)
-        
-        # Performance Tab
-        performance_frame = tk.Frame(notebook, bg='#34495e')
-        notebook.add(performance_frame, text="Performance")
-        self.create_performance_settings(performance_frame)
+        self._numeric_vcmd = None
+        
+        # Tabs are built the first time they are shown; only the first one is built up front
+        tabs = [
+            ("Camera Hardware", self.create_camera_hardware_settings),
+            ("Video Processing", self.create_video_processing_settings),
+            ("Face Detection", self.create_face_detection_settings),
+            ("Face Recognition", self.create_face_recognition_settings),
+            ("Performance", self.create_performance_settings),
+        ]
+        pending_tabs = {}
+        for tab_title, builder in tabs:
+            tab_frame = tk.Frame(notebook, bg='#34495e')
+            notebook.add(tab_frame, text=tab_title)
+            pending_tabs[str(tab_frame)] = (tab_frame, builder)
+        
+        def build_tab(tab_id):
+            """Create the fields of a tab if it has not been built yet"""
+            tab = pending_tabs.pop(tab_id, None)
+            if tab is None:
+                return
+            tab_frame, builder = tab
+            existing_keys = set(self.settings_vars)
+            builder(tab_frame)
+            self.load_settings_into_ui([key for key in self.settings_vars if key not in existing_keys])
+        
+        notebook.bind("<<NotebookTabChanged>>", lambda e: build_tab(notebook.select()))
+        build_tab(notebook.select())
         
         # Button frame
         button_frame = tk.Frame(main_frame, bg='#2c3e50')
         button_frame.pack(fill=tk.X, pady=(10, 0))
         
         # Create buttons
-        def on_save():
-            """Save all settings"""
-            if self.save_all_settings():
+        def on_saved(success):
+            """Report the result of Save & Close once the file has been written"""
+            if success:
                 CustomDialog.show_info(menu_manager.menu_window, "Settings Saved", 
                                      "Camera settings have been saved successfully.\n\n"
                                      "Changes will take effect after restarting the camera.")
@@ -193,6 +323,23 @@ class FileManager:
                                       "Failed to save camera settings.\n\n"
                                       "Please check your input values and try again.")
         
+        def on_applied(success):
+            """Report the result of Apply once the file has been written"""
+            if success:
+                CustomDialog.show_info(menu_manager.menu_window, "Settings Applied", 
+                                     "Camera settings have been applied.\n\n"
+                                     "Changes will take effect after restarting the camera.")
+            else:
+                CustomDialog.show_error(menu_manager.menu_window, "Apply Error", 
+                                      "Failed to apply camera settings.\n\n"
+                                      "Please check your input values and try again.")
+        
+        # Create buttons
+        def on_save():
+            """Save all settings"""
+            if not self.save_all_settings(root, on_saved):
+                on_saved(False)
+        
         def on_reset():
             """Reset to default settings"""
             result = CustomDialog.ask_yes_no(menu_manager.menu_window, "Reset Settings", 
@@ -206,14 +353,8 @@ class FileManager:
         
         def on_apply():
             """Apply settings without closing dialog"""
-            if self.save_all_settings():
-                CustomDialog.show_info(menu_manager.menu_window, "Settings Applied", 
-                                     "Camera settings have been applied.\n\n"
-                                     "Changes will take effect after restarting the camera.")
-            else:
-                CustomDialog.show_error(menu_manager.menu_window, "Apply Error", 
-                                      "Failed to apply camera settings.\n\n"
-                                      "Please check your input values and try again.")
+            if not self.save_all_settings(root, on_applied):
+                on_applied(False)
         
         def on_cancel():
             """Close dialog without saving"""
@@ -263,68 +404,27 @@ class FileManager:
         # Handle window close
         menu_manager.menu_window.protocol("WM_DELETE_WINDOW", on_cancel)
         
-        # Load current settings into UI
-        self.load_settings_into_ui()
-        
  
     
     def create_camera_hardware_settings(self, parent):
         """Create camera hardware settings section"""
-        self.create_settings_section(parent, "Camera Hardware", [
-            ("camera_index", "Camera Index", "int", (0, 5)),
-            ("frame_width", "Frame Width", "int", (160, 1920)),
-            ("frame_height", "Frame Height", "int", (120, 1080)),
-            ("target_fps", "Target FPS", "int", (1, 60)),
-            ("buffer_size", "Buffer Size", "int", (1, 10)),
-            ("auto_exposure", "Auto Exposure", "float", (0.0, 1.0)),
-            ("brightness", "Brightness", "int", (-100, 100)),
-            ("contrast", "Contrast", "int", (-100, 100)),
-            ("saturation", "Saturation", "int", (-100, 100)),
-            ("gain", "Gain", "int", (0, 100)),
-        ])
+        self.create_settings_section(parent, "Camera Hardware", CAMERA_HARDWARE_SETTINGS)
     
     def create_video_processing_settings(self, parent):
         """Create video processing settings section"""
-        self.create_settings_section(parent, "Video Processing", [
-            ("face_detection_interval", "Face Detection Interval", "int", (1, 30)),
-            ("face_cache_size", "Face Cache Size", "int", (1, 50)),
-            ("frame_rotation", "Frame Rotation", "choice", ["90_ccw", "90_cw", "180", "none"]),
-            ("flip_horizontal", "Flip Horizontal (Mirror)", "bool", None),
-            ("flip_vertical", "Flip Vertical", "bool", None),
-            ("memory_cleanup_interval", "Memory Cleanup Interval", "int", (5, 100)),
-        ])
+        self.create_settings_section(parent, "Video Processing", VIDEO_PROCESSING_SETTINGS)
     
     def create_face_detection_settings(self, parent):
         """Create face detection settings section"""
-        self.create_settings_section(parent, "Face Detection", [
-            ("min_face_size", "Min Face Size", "int", (10, 320)),
-            ("detection_scale_factor", "Detection Scale Factor", "float", (0.1, 1.0)),
-            ("mtcnn_threshold_1", "MTCNN Threshold 1", "float", (0.1, 1.0)),
-            ("mtcnn_threshold_2", "MTCNN Threshold 2", "float", (0.1, 1.0)),
-            ("mtcnn_threshold_3", "MTCNN Threshold 3", "float", (0.1, 1.0)),
-            ("detection_confidence_threshold", "Detection Confidence", "float", (0.1, 1.0)),
-            ("min_face_region_size", "Min Face Region Size", "int", (10, 100)),
-        ])
+        self.create_settings_section(parent, "Face Detection", FACE_DETECTION_SETTINGS)
     
     def create_face_recognition_settings(self, parent):
         """Create face recognition settings section"""
-        self.create_settings_section(parent, "Face Recognition", [
-            ("recognition_threshold", "Recognition Threshold", "float", (0.1, 1.0)),
-            ("recognition_interval", "Recognition Interval", "int", (1, 10)),
-            ("embedding_cache_size", "Embedding Cache Size", "int", (10, 500)),
-            ("confidence_boost_factor", "Confidence Boost Factor", "float", (0.01, 0.5)),
-            ("confidence_decay_factor", "Confidence Decay Factor", "float", (0.01, 0.5)),
-        ])
+        self.create_settings_section(parent, "Face Recognition", FACE_RECOGNITION_SETTINGS)
     
     def create_performance_settings(self, parent):
         """Create performance settings section"""
-        self.create_settings_section(parent, "Performance", [
-            ("enable_gpu", "Enable GPU", "bool", None),
-            ("image_quality", "Image Quality", "choice", ["low", "medium", "high"]),
-            ("tracking_enabled", "Face Tracking", "bool", None),
-            ("max_track_distance", "Max Track Distance", "int", (10, 200)),
-            ("track_timeout", "Track Timeout", "int", (5, 100)),
-        ])
+        self.create_settings_section(parent, "Performance", PERFORMANCE_SETTINGS)
     
     def create_settings_section(self, parent, title, settings):
         """Create a settings section with input fields"""
@@ -348,156 +448,165 @@ class FileManager:
         title_label = tk.Label(scrollable_frame, text=f"{title} Settings", 
                               font=('Arial', 14, 'bold'), 
                               fg='#ecf0f1', bg='#34495e')
-        title_label.pack(pady=(5, 15), anchor='w')
+        title_label.grid(row=0, column=0, columnspan=3, pady=(5, 15), sticky='w')
+        scrollable_frame.columnconfigure(2, weight=1)
         
-        # Create input fields
-        for setting_key, label_text, input_type, constraints in settings:
-            self.create_setting_field(scrollable_frame, setting_key, label_text, input_type, constraints)
+        # Create input fields, one grid row per setting
+        for row, (setting_key, label_text, input_type, constraints) in enumerate(settings, start=1):
+            self.create_setting_field(scrollable_frame, row, setting_key, label_text, input_type, constraints)
     
-    def create_setting_field(self, parent, key, label_text, input_type, constraints):
-        """Create a single setting input field"""
-        frame = tk.Frame(parent, bg='#34495e')
-        frame.pack(fill=tk.X, pady=5)
-        
+    def is_numeric_input(self, proposed):
+        """Spinbox key validator: allow numbers and the partial strings typed on the way to one"""
+        if proposed in ("", "-", ".", "-."):
+            return True
+        try:
+            float(proposed)
+            return True
+        except ValueError:
+            return False
+    
+    def create_setting_field(self, parent, row, key, label_text, input_type, constraints):
+        """Create a single setting input field in the given grid row"""
         # Label
-        label = tk.Label(frame, text=f"{label_text}:", 
+        label = tk.Label(parent, text=f"{label_text}:", 
                         font=('Arial', 10), 
                         fg='#bdc3c7', bg='#34495e',
                         width=25, anchor='w')
-        label.pack(side=tk.LEFT, padx=(5, 10))
+        label.grid(row=row, column=0, padx=(5, 10), pady=5, sticky='w')
         
         # Input field based on type
         if input_type == "int":
             var = tk.IntVar()
-            entry = tk.Spinbox(frame, textvariable=var, 
+            caster = int
+            entry = tk.Spinbox(parent, textvariable=var, 
                               from_=constraints[0], to=constraints[1],
                               font=('Arial', 10), width=10,
                               bg='#ecf0f1', relief=tk.SUNKEN, bd=2)
         elif input_type == "float":
             var = tk.DoubleVar()
-            entry = tk.Entry(frame, textvariable=var,
-                            font=('Arial', 10), width=10,
-                            bg='#ecf0f1', relief=tk.SUNKEN, bd=2)
+            caster = float
+            if self._numeric_vcmd is None:
+                self._numeric_vcmd = (parent.register(self.is_numeric_input), '%P')
+            entry = tk.Spinbox(parent, textvariable=var,
+                              from_=constraints[0], to=constraints[1],
+                              increment=0.01, format="%.3f",
+                              validate='key', validatecommand=self._numeric_vcmd,
+                              font=('Arial', 10), width=10,
+                              bg='#ecf0f1', relief=tk.SUNKEN, bd=2)
         elif input_type == "bool":
             var = tk.BooleanVar()
-            entry = tk.Checkbutton(frame, variable=var,
+            caster = bool
+            entry = tk.Checkbutton(parent, variable=var,
                                   bg='#34495e', fg='#ecf0f1',
                                   selectcolor='#2c3e50')
         elif input_type == "choice":
             var = tk.StringVar()
-            entry = ttk.Combobox(frame, textvariable=var,
+            caster = str
+            entry = ttk.Combobox(parent, textvariable=var,
                                values=constraints, state="readonly",
                                font=('Arial', 10), width=12)
         else:
             var = tk.StringVar()
-            entry = tk.Entry(frame, textvariable=var,
+            caster = str
+            entry = tk.Entry(parent, textvariable=var,
                             font=('Arial', 10), width=15,
                             bg='#ecf0f1', relief=tk.SUNKEN, bd=2)
         
-        entry.pack(side=tk.LEFT, padx=(0, 10))
+        entry.grid(row=row, column=1, padx=(0, 10), pady=5, sticky='w')
         
         # Description
         desc_text = camera_config.get_config_description(key)
-        desc_label = tk.Label(frame, text=desc_text,
+        desc_label = tk.Label(parent, text=desc_text,
                              font=('Arial', 8), 
                              fg='#95a5a6', bg='#34495e',
                              wraplength=300, justify=tk.LEFT)
-        desc_label.pack(side=tk.LEFT, padx=(10, 5))
+        desc_label.grid(row=row, column=2, padx=(10, 5), pady=5, sticky='w')
         
-        # Store the variable for later access
-        self.settings_vars[key] = var
+        # Store the variable with the type its value is converted to
+        self.settings_vars[key] = (var, caster)
     
-    def load_settings_into_ui(self):
-        """Load current configuration values into UI elements"""
-        for key, var in self.settings_vars.items():
+    def load_settings_into_ui(self, keys=None):
+        """Load current configuration values into UI elements (all fields, or only the given keys)"""
+        for key in (self.settings_vars if keys is None else keys):
+            var, caster = self.settings_vars[key]
             try:
-                value = camera_config.get(key)
-                if isinstance(var, tk.BooleanVar):
-                    var.set(bool(value))
-                elif isinstance(var, tk.IntVar):
-                    var.set(int(value))
-                elif isinstance(var, tk.DoubleVar):
-                    var.set(float(value))
-                else:
-                    var.set(str(value))
+                var.set(caster(camera_config.get(key)))
             except Exception as e:
-                print(f"Error loading setting {key}: {e}")
+                log.warning("Error loading setting %s: %s", key, e)
     
-    def save_all_settings(self) -> bool:
-        """Save all settings from UI to configuration"""
+    def save_all_settings(self, root, on_complete) -> bool:
+        """Validate the UI values and write them to disk in the background.
+        
+        Returns False if the values could not be read or are invalid. Otherwise
+        on_complete(success) is called on the Tk thread once the file is written.
+        """
         try:
-            new_config = {}
-            for key, var in self.settings_vars.items():
-                try:
-                    if isinstance(var, tk.BooleanVar):
-                        new_config[key] = var.get()
-                    elif isinstance(var, tk.IntVar):
-                        new_config[key] = var.get()
-                    elif isinstance(var, tk.DoubleVar):
-                        new_config[key] = var.get()
-                    else:
-                        new_config[key] = var.get()
-                except Exception as e:
-                    print(f"Error getting value for {key}: {e}")
-                    return False
+            # Numeric fields only accept numeric keystrokes, so this can only fail on a blank field
+            try:
+                new_config = {key: caster(var.get()) for key, (var, caster) in self.settings_vars.items()}
+            except tk.TclError as e:
+                log.warning("Error getting setting values: %s", e)
+                return False
             
             # Validate configuration
             if not self.validate_settings(new_config):
                 return False
             
-            # Update and save configuration
+            # Only values that differ from what the running components last received need applying
+            changed = {key: value for key, value in new_config.items()
+                       if self._last_applied_config.get(key) != value}
+            
+            # Update in memory now; the file write runs off the Tk thread on a
+            # snapshot, since the Tk thread may change the live dict meanwhile
             camera_config.update_config(new_config)
-            success = camera_config.save_config()
+            future = self._save_executor.submit(camera_config.save_config, dict(camera_config.config))
             
-            if success:
-                # Apply changes to running components
-                self.apply_runtime_changes()
+            def poll_save():
+                if not future.done():
+                    root.after(SAVE_POLL_MS, poll_save)
+                    return
+                success = future.result()
+                if success and changed:
+                    # Apply changes to running components
+                    self.apply_runtime_changes(changed)
+                on_complete(success)
             
-            return success
+            root.after(SAVE_POLL_MS, poll_save)
+            return True
             
         except Exception as e:
-            print(f"Error saving settings: {e}")
+            log.error("Error saving settings: %s", e)
             return False
     
-    def apply_runtime_changes(self):
-        """Apply configuration changes to running components"""
+    def apply_runtime_changes(self, changed):
+        """Apply the changed configuration values to running components"""
         try:
             if self.app_instance is not None:
                 # Apply camera configuration changes
                 if hasattr(self.app_instance, 'camera_handler'):
                     self.app_instance.camera_handler.apply_config_changes()
                 
-                # Apply face processor configuration changes  
-                if hasattr(self.app_instance, 'face_processor'):
+                # Apply face processor configuration changes (rebuilds MTCNN, so only when its inputs changed)
+                if hasattr(self.app_instance, 'face_processor') and not FACE_PROCESSOR_KEYS.isdisjoint(changed):
                     self.app_instance.face_processor.apply_config_changes()
                 
-                print("✅ Runtime configuration changes applied")
+                self._last_applied_config.update(changed)
+                
+                log.info("Runtime configuration changes applied: %s", ", ".join(changed))
             else:
-                print("ℹ️  Configuration saved. Changes will take effect on next restart.")
+                log.info("Configuration saved. Changes will take effect on next restart.")
                 
         except Exception as e:
-            print(f"⚠️  Configuration saved but runtime update failed: {e}")
-            print("Changes will take effect on next restart.")
+            log.warning("Configuration saved but runtime update failed: %s. "
+                        "Changes will take effect on next restart.", e)
     
     def validate_settings(self, config) -> bool:
         """Validate configuration values"""
-        validators = {
-            "frame_width": lambda x: 160 <= x <= 1920,
-            "frame_height": lambda x: 120 <= x <= 1080,
-            "target_fps": lambda x: 1 <= x <= 60,
-            "buffer_size": lambda x: 1 <= x <= 10,
-            "auto_exposure": lambda x: 0.0 <= x <= 1.0,
-            "face_detection_interval": lambda x: 1 <= x <= 30,
-            "min_face_size": lambda x: 10 <= x <= 200,
-            "recognition_threshold": lambda x: 0.1 <= x <= 1.0,
-            "detection_confidence_threshold": lambda x: 0.1 <= x <= 1.0,
-            "detection_scale_factor": lambda x: 0.1 <= x <= 1.0,
-        }
-        
-        for key, validator in validators.items():
-            if key in config and not validator(config[key]):
+        for key, (low, high) in CONFIG_RANGES.items():
+            value = config.get(key)
+            if value is not None and not low <= value <= high:
                 CustomDialog.show_error(None, "Invalid Value", 
-                                      f"Invalid value for {key}: {config[key]}\n\n"
+                                      f"Invalid value for {key}: {value}\n\n"
                                       f"Please check the allowed range.")
                 return False
         
@@ -505,17 +614,18 @@ class FileManager:
     
     def show_recognition_settings(self, root):
         """Show face recognition settings dialog"""
-        settings_text = """Face Recognition Settings:
-
-• Model: FaceNet (MTCNN + InceptionResnetV1)
-• Detection Threshold: 0.8
-• Recognition Threshold: 0.7
-• Face Detection Interval: Every 5th frame
-• Recognition Cooldown: 1 second
-
-To modify recognition settings, edit the relevant methods."""
-        
-        CustomDialog.show_info(root, "Recognition Settings", settings_text)
+        CustomDialog.show_info(root, "Recognition Settings", RECOGNITION_SETTINGS_TEXT)
+    
+    def get_database_stats(self, attendance_db):
+        """Return (employee_count, today_checkins), reusing the last result for DB_STATS_TTL seconds"""
+        now = time.monotonic()
+        if self._db_stats is not None and now - self._db_stats_time < DB_STATS_TTL:
+            return self._db_stats
+        
+        today = date.today().isoformat()
+        self._db_stats = (attendance_db.count_employees(), attendance_db.count_checkins_on(today))
+        self._db_stats_time = now
+        return self._db_stats
     
     def show_database_settings(self, root, attendance_manager):
         """Show database settings dialog"""
@@ -524,18 +634,12 @@ To modify recognition settings, edit the relevant methods."""
             return
         
         try:
-            from datetime import datetime
-            # Get database info
-            employees = attendance_manager.attendance_db.get_employees()
-            employee_count = len(employees)
-            
-            today = datetime.now().strftime("%Y-%m-%d")
-            records = attendance_manager.attendance_db.get_attendance_report(today, today)
-            today_checkins = len([r for r in records if r.get('check_in_time')])
+            employee_count, today_checkins = self.get_database_stats(attendance_manager.attendance_db)
             
             settings_text = f"""Database Settings:
 
 • Database Type: SQLite
+• Journal Mode: WAL
 • Total Employees: {employee_count}
 • Today's Check-ins: {today_checkins}
 • Database File: attendance.db
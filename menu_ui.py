@@ -1,11 +1,73 @@
+import logging
 import tkinter as tk
 from tkinter import ttk
+from tkinter import font as tkfont
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
+from operator import itemgetter
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from ui_dialogs import CustomDialog
-from attendance_database import AttendanceDatabase
+from attendance_database import AttendanceDatabase, time_of_day
 from virtual_keyboard import VirtualKeyboard
 
+log = logging.getLogger(__name__)
+
+# Shared options for the main menu buttons (font is a named font created on first use)
+MENU_BUTTON_CONFIG = {'width': 19, 'height': 2, 'relief': tk.RAISED, 'bd': 2, 'cursor': 'hand2'}
+
+# Number of employees shown per page in the employee details list
+EMPLOYEES_PER_PAGE = 50
+
+# Number of recent check-ins listed in the employee details
+RECENT_CHECKINS_SHOWN = 5
+
+# Milliseconds between checks for finished background database queries
+DB_POLL_MS = 30
+
+# Check-in and check-out times of an attendance record
+CHECK_TIMES = itemgetter('check_in_time', 'check_out_time')
+
+# Milliseconds a status message stays in the employee window
+STATUS_CLEAR_MS = 2000
+
+# One employee in the registered employees report
+EMPLOYEE_REPORT_ENTRY = "%d. %s\n   Department: %s\n   Position: %s\n\n"
+
+# Check-in photos kept decoded for re-display, and their maximum displayed size
+PHOTO_CACHE_SIZE = 64
+PHOTO_MAX_SIZE = 400
+
+
+@lru_cache(maxsize=None)
+def long_date(date_str):
+    """Format a YYYY-MM-DD date as e.g. 'March 05, 2024'; cached since the same dates repeat across pages"""
+    try:
+        return datetime.strptime(date_str, '%Y-%m-%d').strftime('%B %d, %Y')
+    except ValueError:
+        return date_str
+
+
+@lru_cache(maxsize=PHOTO_CACHE_SIZE)
+def load_checkin_photo(photo_path):
+    """Read a check-in photo scaled to fit the viewer; cached by path (also keeps the PhotoImage alive)"""
+    import cv2
+    from PIL import Image, ImageTk
+    
+    img = cv2.imread(photo_path)
+    if img is None:
+        return None
+    pil_img = Image.fromarray(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+    
+    # Scale down to fit the display
+    img_width, img_height = pil_img.size
+    if img_width > PHOTO_MAX_SIZE or img_height > PHOTO_MAX_SIZE:
+        scale = min(PHOTO_MAX_SIZE / img_width, PHOTO_MAX_SIZE / img_height)
+        pil_img = pil_img.resize((int(img_width * scale), int(img_height * scale)), Image.Resampling.LANCZOS)
+    
+    return ImageTk.PhotoImage(pil_img)
+
 
 class MenuManager:
     """Handles menu windows and UI management"""
@@ -15,7 +77,14 @@ class MenuManager:
         self.current_page = 0
         self.dates_per_page = 30
         self.selected_date = None
-        self.attendance_db = AttendanceDatabase()
+        self.attendance_db = AttendanceDatabase.instance()
+        self.shown_employees_version = -1
+        self._db_executor = ThreadPoolExecutor(max_workers=1)
+        self._stats_future = None
+        self._menu_button_font = None
+        self._add_employee_dialog = None
+        self._menu_geom = (0, 0, 0, 0)
+        self._photo_paths = {}
         self._injected_start_capture = lambda menu_window=None: None
         self.active_keyboards = []  # Track active virtual keyboards
     
@@ -111,6 +180,9 @@ class MenuManager:
         center_x = int(screen_width/2 - window_width/2)
         center_y = int(screen_height/2 - window_height/2)
         self.menu_window.geometry(f'{screen_width}x{window_height}+{center_x}+{center_y}')
+        # Track the window's placement so dialogs can center on it without a layout flush
+        self._menu_geom = (center_x, center_y, screen_width, window_height)
+        self.menu_window.bind('<Configure>', self.on_menu_configure)
         # Make window resizable for user flexibility
         self.menu_window.resizable(True, True)
         self.menu_window.minsize(screen_width, 500)  # Set minimum size
@@ -119,10 +191,19 @@ class MenuManager:
         # Center the window
         self.show_menu()
     
+    def on_menu_configure(self, event):
+        """Remember the menu window's position and size when it changes"""
+        # The binding on the Toplevel also fires for every child widget
+        if event.widget is self.menu_window:
+            self._menu_geom = (self.menu_window.winfo_x(), self.menu_window.winfo_y(),
+                               event.width, event.height)
+    
     def show_menu(self):
         # Main container
         main_frame = tk.Frame(self.menu_window, bg='#2c3e50')
         main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        # The window has a fixed geometry; don't re-request its size as sections are added
+        main_frame.pack_propagate(False)
     
         # Title (larger font)
         title_label = tk.Label(main_frame, text="Main Menu", 
@@ -130,11 +211,28 @@ class MenuManager:
                               fg='#ecf0f1', bg='#2c3e50')
         title_label.pack(pady=(0, 30))
         
-        # Create sections
+        # Create the first section now and the rest once the window has drawn
         self.create_employee_section(main_frame)
-        self.create_edit_section(main_frame)
-        self.create_settings_section(main_frame)
-        self.create_system_section(main_frame)
+
+        def create_remaining_sections():
+            # The menu may have been replaced before the idle callback ran
+            if not main_frame.winfo_exists():
+                return
+            self.create_edit_section(main_frame)
+            self.create_settings_section(main_frame)
+            self.create_system_section(main_frame)
+
+        main_frame.after_idle(create_remaining_sections)
+    
+    def make_menu_button(self, parent, text, command, bg, padx=(0, 10)):
+        """Create and pack a main menu button sharing one named font"""
+        if self._menu_button_font is None:
+            self._menu_button_font = tkfont.Font(family='Arial', size=14, weight='bold')
+        button = tk.Button(parent, text=text, command=command,
+                           bg=bg, fg='white', font=self._menu_button_font,
+                           **MENU_BUTTON_CONFIG)
+        button.pack(side=tk.LEFT, padx=padx)
+        return button
     
     def create_employee_section(self, parent):
         """Create Employee Check-in Details section"""
@@ -145,31 +243,18 @@ class MenuManager:
                                     relief=tk.RAISED, bd=2)
         section_frame.pack(fill=tk.X, pady=(0, 15))
         
-        # Button configurations (larger font)
-        button_config = {'font': ('Arial', 14, 'bold'), 'width': 19, 'height': 2,
-                        'relief': tk.RAISED, 'bd': 2, 'cursor': 'hand2'}
-        
         # Buttons frame
         buttons_frame = tk.Frame(section_frame, bg='#2c3e50')
         buttons_frame.pack(fill=tk.X, padx=15, pady=15)
         
         # Single Employee Check-in Details button with click protection
-        employee_detail_btn = tk.Button(buttons_frame, text="Employee Details", 
-                                       command=lambda: self.show_employee(parent),
-                                       bg='#3498db', fg='white', **button_config)
-        employee_detail_btn.pack(side=tk.LEFT, padx=(0, 10))
+        self.make_menu_button(buttons_frame, "Employee Details", lambda: self.show_employee(parent), '#3498db')
         
         # Additional utility buttons with click protection
-        photos_btn = tk.Button(buttons_frame, text="Check-in Details", 
-                              command=self.show_checkin,
-                              bg='#e67e22', fg='white', **button_config)
-        photos_btn.pack(side=tk.LEFT, padx=(0, 10))
+        self.make_menu_button(buttons_frame, "Check-in Details", self.show_checkin, '#e67e22')
         
         # Export Report button with click protection
-        export_btn = tk.Button(buttons_frame, text="Export Report", 
-                              command=self.export_attendance_report,
-                              bg='#27ae60', fg='white', **button_config)
-        export_btn.pack(side=tk.LEFT)
+        self.make_menu_button(buttons_frame, "Export Report", self.export_attendance_report, '#27ae60', padx=0)
     
     def create_edit_section(self, parent):
         """Create Edit section"""
@@ -180,24 +265,14 @@ class MenuManager:
                                     relief=tk.RAISED, bd=2)
         section_frame.pack(fill=tk.X, pady=(0, 15))
         
-        # Button configurations (larger font)
-        button_config = {'font': ('Arial', 14, 'bold'), 'width': 19, 'height': 2,
-                        'relief': tk.RAISED, 'bd': 2, 'cursor': 'hand2'}
-        
         # Buttons frame
         buttons_frame = tk.Frame(section_frame, bg='#2c3e50')
         buttons_frame.pack(fill=tk.X, padx=15, pady=15)
         
         # Edit Today's Check-ins button with click protection
-        edit_btn = tk.Button(buttons_frame, text="Edit Check-ins", 
-                            command=self.show_edit,
-                            bg='#e74c3c', fg='white', **button_config)
-        edit_btn.pack(side=tk.LEFT, padx=(0, 10))
+        self.make_menu_button(buttons_frame, "Edit Check-ins", self.show_edit, '#e74c3c')
 
-        edit_employee_btn = tk.Button(buttons_frame, text="Add Employee", 
-                            command=self.start_capture,
-                            bg='#27ae60', fg='white', **button_config)
-        edit_employee_btn.pack(side=tk.LEFT)
+        self.make_menu_button(buttons_frame, "Add Employee", self.start_capture, '#27ae60', padx=0)
     
     def create_settings_section(self, parent):
         """Create Settings section"""
@@ -208,35 +283,19 @@ class MenuManager:
                                     relief=tk.RAISED, bd=2)
         section_frame.pack(fill=tk.X, pady=(0, 15))
         
-        # Button configurations (larger font)
-        button_config = {'font': ('Arial', 14, 'bold'), 'width': 19, 'height': 2,
-                        'relief': tk.RAISED, 'bd': 2, 'cursor': 'hand2'}
-        
         # Buttons frame
         buttons_frame = tk.Frame(section_frame, bg='#2c3e50')
         buttons_frame.pack(fill=tk.X, padx=15, pady=15)
-        attendance_btn = tk.Button(buttons_frame, text="Attendance", 
-                              command=lambda: self.show_attendance_settings(parent),
-                              bg='#34495e', fg='white', **button_config)
-        attendance_btn.pack(side=tk.LEFT, padx=(0, 10))
+        self.make_menu_button(buttons_frame, "Attendance", lambda: self.show_attendance_settings(parent), '#34495e')
         
         # Camera Settings button with click protection
-        camera_btn = tk.Button(buttons_frame, text="Camera", 
-                              command=self.show_camera_settings,
-                              bg='#34495e', fg='white', **button_config)
-        camera_btn.pack(side=tk.LEFT, padx=(0, 10))
+        self.make_menu_button(buttons_frame, "Camera", self.show_camera_settings, '#34495e')
         
         # Recognition Settings button with click protection
-        recognition_btn = tk.Button(buttons_frame, text="Recognition", 
-                                  command=self.show_recognition_settings,
-                                  bg='#34495e', fg='white', **button_config)
-        recognition_btn.pack(side=tk.LEFT, padx=(0, 10))
+        self.make_menu_button(buttons_frame, "Recognition", self.show_recognition_settings, '#34495e')
         
         # Database Settings button with click protection
-        db_btn = tk.Button(buttons_frame, text="Database Settings", 
-                          command=self.show_database_settings,
-                          bg='#34495e', fg='white', **button_config)
-        db_btn.pack(side=tk.LEFT)
+        self.make_menu_button(buttons_frame, "Database Settings", self.show_database_settings, '#34495e', padx=0)
     
     def create_system_section(self, parent):
         """Create System section"""
@@ -247,33 +306,46 @@ class MenuManager:
                                     relief=tk.RAISED, bd=2)
         section_frame.pack(fill=tk.X, pady=(0, 15))
         
-        # Button configurations (larger font)
-        button_config = {'font': ('Arial', 14, 'bold'), 'width': 19, 'height': 2,
-                        'relief': tk.RAISED, 'bd': 2, 'cursor': 'hand2'}
-        
         # Buttons frame
         buttons_frame = tk.Frame(section_frame, bg='#2c3e50')
         buttons_frame.pack(fill=tk.X, padx=15, pady=15)
         
         # Reset System button with click protection
-        reset_btn = tk.Button(buttons_frame, text="Reset System", 
-                             command=self.reset_system,
-                             bg='#f39c12', fg='white', **button_config)
-        reset_btn.pack(side=tk.LEFT, padx=(0, 10))
+        self.make_menu_button(buttons_frame, "Reset System", self.reset_system, '#f39c12')
         
         # Exit button with click protection
-        exit_btn = tk.Button(buttons_frame, text="Exit System", 
-                            command=self.cleanup_and_exit,
-                            bg='#e74c3c', fg='white', **button_config)
-        exit_btn.pack(side=tk.LEFT ,padx=(0, 10))
+        self.make_menu_button(buttons_frame, "Exit System", self.cleanup_and_exit, '#e74c3c')
         
         # Close Menu button with click protection
-        close_btn = tk.Button(buttons_frame, text="Close Menu", 
-                             command=lambda: self.close_menu_window(),
-                             bg='#95a5a6', fg='white', **button_config)
-        close_btn.pack(side=tk.LEFT, padx=(0, 10))
+        close_btn = self.make_menu_button(buttons_frame, "Close Menu", lambda: self.close_menu_window(), '#95a5a6')
         close_btn.focus_set()
     
+    def clear_menu_window(self):
+        """Destroy the current view in the menu window (each view is one top-level frame)"""
+        for widget in self.menu_window.winfo_children():
+            # Hidden dialogs such as the reusable add-employee dialog outlive view changes
+            if not isinstance(widget, tk.Toplevel):
+                widget.destroy()
+    
+    def run_db_task(self, widget, func, on_done, error_message):
+        """Run func on the database worker and pass its result to on_done on the Tk thread"""
+        future = self._db_executor.submit(func)
+        
+        def poll():
+            if not widget.winfo_exists():
+                return  # The view was closed while the query ran
+            if not future.done():
+                widget.after(DB_POLL_MS, poll)
+                return
+            try:
+                result = future.result()
+            except Exception as e:
+                CustomDialog.show_error(self.menu_window, "Error", f"{error_message}: {e}")
+                return
+            on_done(result)
+        
+        widget.after(DB_POLL_MS, poll)
+    
     def close_menu_window(self):
         # Resume video processing when menu closes
         if hasattr(self, 'camera_handler') and self.camera_handler:
@@ -291,6 +363,7 @@ class MenuManager:
         # Main container
         main_frame = tk.Frame(self.menu_window, bg='#2c3e50')
         main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        main_frame.pack_propagate(False)
         # Title (larger font)
         title_label = tk.Label(main_frame, text="Employee Check-in Details", 
                               font=('Arial', 24, 'bold'), 
@@ -347,6 +420,37 @@ class MenuManager:
         
         # Bind selection event
         self.employee_listbox.bind('<<ListboxSelect>>', self.on_employee_detail_select)
+        
+        # Page controls
+        page_frame = tk.Frame(left_frame, bg='#2c3e50')
+        page_frame.pack(fill=tk.X, pady=(10, 0))
+        
+        self.employee_prev_btn = tk.Button(page_frame, text="◀ Prev", 
+                                           command=lambda: self.change_employee_page(-1),
+                                           font=('Arial', 12, 'bold'),
+                                           bg='#34495e', fg='white',
+                                           width=8, relief=tk.RAISED, bd=2)
+        self.employee_prev_btn.pack(side=tk.LEFT)
+        
+        self.employee_next_btn = tk.Button(page_frame, text="Next ▶", 
+                                           command=lambda: self.change_employee_page(1),
+                                           font=('Arial', 12, 'bold'),
+                                           bg='#34495e', fg='white',
+                                           width=8, relief=tk.RAISED, bd=2)
+        self.employee_next_btn.pack(side=tk.RIGHT)
+        
+        self.employee_page_label = tk.Label(page_frame, text="", 
+                                            font=('Arial', 12), 
+                                            fg='#bdc3c7', bg='#2c3e50')
+        self.employee_page_label.pack(expand=True)
+        
+        self.employee_page = 0
+    
+    def change_employee_page(self, delta):
+        """Move the employee list to the previous or next page"""
+        self.employee_page = max(0, self.employee_page + delta)
+        self.load_employee_data()
+        self.show_no_selection_message()
     
     def create_employee_details_section(self, parent):
         """Create employee details section on the right"""
@@ -368,6 +472,78 @@ class MenuManager:
         self.details_content = tk.Frame(details_container, bg='#34495e')
         self.details_content.pack(fill=tk.BOTH, expand=True, padx=15, pady=15)
         
+        # Message shown instead of the details (no selection, deletion result)
+        self.details_message_label = tk.Label(self.details_content, text="", 
+                                              font=('Arial', 12), 
+                                              fg='#95a5a6', bg='#34495e',
+                                              justify=tk.CENTER)
+        
+        # Details widgets are built once and updated in place on each selection
+        self.details_body = tk.Frame(self.details_content, bg='#34495e')
+        
+        # Selected employee header with visual emphasis
+        header_frame = tk.Frame(self.details_body, bg='#3498db', relief=tk.RAISED, bd=2)
+        header_frame.pack(fill=tk.X, pady=(0, 15))
+        self.details_name_label = tk.Label(header_frame, text="", 
+                                           font=('Arial', 16, 'bold'), 
+                                           fg='white', bg='#3498db')
+        self.details_name_label.pack(pady=(0, 5))
+        
+        # Basic info: department, position, employee ID
+        info_frame = tk.Frame(self.details_body, bg='#34495e')
+        info_frame.pack(fill=tk.X, pady=(0, 15))
+        self.details_info_labels = []
+        for _ in range(3):
+            info_label = tk.Label(info_frame, text="", 
+                                  font=('Arial', 11), 
+                                  fg='#bdc3c7', bg='#34495e')
+            info_label.pack(anchor=tk.W, pady=2)
+            self.details_info_labels.append(info_label)
+        
+        # Separator
+        separator = tk.Frame(self.details_body, bg='#7f8c8d', height=2)
+        separator.pack(fill=tk.X, pady=10)
+        
+        # Work statistics
+        stats_label = tk.Label(self.details_body, text="Work Statistics", 
+                              font=('Arial', 12, 'bold'), 
+                              fg='#ecf0f1', bg='#34495e')
+        stats_label.pack(anchor=tk.W, pady=(10, 5))
+        
+        stats_frame = tk.Frame(self.details_body, bg='#34495e')
+        stats_frame.pack(fill=tk.X, pady=5)
+        self.today_status_var = tk.StringVar(stats_frame)
+        self.week_hours_var = tk.StringVar(stats_frame)
+        self.month_days_var = tk.StringVar(stats_frame)
+        self.today_status_label = tk.Label(stats_frame, textvariable=self.today_status_var, 
+                                           font=('Arial', 11), bg='#34495e')
+        self.today_status_label.pack(anchor=tk.W, pady=2)
+        self.week_hours_label = tk.Label(stats_frame, textvariable=self.week_hours_var, 
+                                         font=('Arial', 11), 
+                                         fg='#3498db', bg='#34495e')
+        self.week_hours_label.pack(anchor=tk.W, pady=2)
+        self.month_days_label = tk.Label(stats_frame, textvariable=self.month_days_var, 
+                                         font=('Arial', 11), 
+                                         fg='#9b59b6', bg='#34495e')
+        self.month_days_label.pack(anchor=tk.W, pady=2)
+        self.stats_error_label = tk.Label(stats_frame, text="", 
+                                          font=('Arial', 10), 
+                                          fg='#e74c3c', bg='#34495e')
+        
+        # Recent check-ins (last 5)
+        recent_label = tk.Label(self.details_body, text="Recent Check-ins", 
+                               font=('Arial', 12, 'bold'), 
+                               fg='#ecf0f1', bg='#34495e')
+        recent_label.pack(anchor=tk.W, pady=(15, 5))
+        
+        recent_frame = tk.Frame(self.details_body, bg='#2c3e50', relief=tk.SUNKEN, bd=1)
+        recent_frame.pack(fill=tk.X, pady=5)
+        self.recent_checkins_label = tk.Label(recent_frame, text="", 
+                                              font=('Arial', 10), 
+                                              fg='#ecf0f1', bg='#2c3e50',
+                                              justify=tk.LEFT)
+        self.recent_checkins_label.pack(anchor=tk.W, padx=10, pady=5)
+        
         # Initial message
         self.show_no_selection_message()
     
@@ -398,6 +574,14 @@ class MenuManager:
                               relief=tk.RAISED, bd=2)
         delete_btn.pack(side=tk.LEFT, padx=(0, 10))
         
+        # Short-lived status messages (e.g. after a refresh)
+        self.status_var = tk.StringVar(button_frame)
+        self._status_clear_id = None
+        self.status_label = tk.Label(left_buttons, textvariable=self.status_var, 
+                                     font=('Arial', 11), 
+                                     fg='#2ecc71', bg='#2c3e50')
+        self.status_label.pack(side=tk.LEFT, padx=(0, 10))
+        
         # Right side buttons (utility)
         right_buttons = tk.Frame(button_frame, bg='#2c3e50')
         right_buttons.pack(side=tk.RIGHT)
@@ -424,8 +608,7 @@ class MenuManager:
     def close_employee_window(self):
         # Clear the current frame and show main menu
         if self.menu_window and self.menu_window.winfo_exists():
-            for widget in self.menu_window.winfo_children():
-                widget.destroy()
+            self.clear_menu_window()
             self.show_menu()
     
 
@@ -437,24 +620,32 @@ class MenuManager:
             CustomDialog.show_error(self.menu_window, "Error", "Attendance database not initialized.")
             return
         try:
-            employees = self.attendance_db.get_employees()
+            # Only query the page being shown
+            total = self.attendance_db.count_employees()
+            page_count = max(1, -(-total // EMPLOYEES_PER_PAGE))
+            self.employee_page = min(self.employee_page, page_count - 1)
+            employees = self.attendance_db.get_employees(
+                limit=EMPLOYEES_PER_PAGE, offset=self.employee_page * EMPLOYEES_PER_PAGE)
             
             # Clear existing items
             self.employee_listbox.delete(0, tk.END)
             
             # Store employee data
             self.employee_data = employees
+            self.shown_employees_version = self.attendance_db.employees_version
+            
+            # Update page controls
+            self.employee_page_label.config(text=f"Page {self.employee_page + 1} of {page_count}")
+            self.employee_prev_btn.config(state=tk.NORMAL if self.employee_page > 0 else tk.DISABLED)
+            self.employee_next_btn.config(state=tk.NORMAL if self.employee_page < page_count - 1 else tk.DISABLED)
             
             if not employees:
                 self.employee_listbox.insert(tk.END, "No employees found")
                 return
             
-            # Add employees to listbox
-            for employee in employees:
-                name = employee['name']
-                dept = employee.get('department', 'N/A')
-                display_text = f"{name} ({dept})"
-                self.employee_listbox.insert(tk.END, display_text)
+            # Add all employees to the listbox in a single insert
+            items = [f"{employee['name']} ({employee.get('department', 'N/A')})" for employee in employees]
+            self.employee_listbox.insert(tk.END, *items)
             
         except Exception as e:
             CustomDialog.show_error(self.menu_window, "Error", f"Failed to load employee data: {e}")
@@ -475,179 +666,137 @@ class MenuManager:
     
     def show_employee_details(self, employee):
         """Show detailed information for selected employee"""
-        # Clear previous content
-        for widget in self.details_content.winfo_children():
-            widget.destroy()
+        self.details_message_label.pack_forget()
+        self.details_body.pack(fill=tk.BOTH, expand=True)
         
-        # Selected employee header with visual emphasis
-        header_frame = tk.Frame(self.details_content, bg='#3498db', relief=tk.RAISED, bd=2)
-        header_frame.pack(fill=tk.X, pady=(0, 15))
-        # Employee name with emphasis
-        name_label = tk.Label(header_frame, text=f"{employee['name']}", 
-                             font=('Arial', 16, 'bold'), 
-                             fg='white', bg='#3498db')
-        name_label.pack(pady=(0, 5))
-        
-        # Basic info frame
-        info_frame = tk.Frame(self.details_content, bg='#34495e')
-        info_frame.pack(fill=tk.X, pady=(0, 15))
+        self.details_name_label.config(text=f"{employee['name']}")
+        info_texts = (f"Department: {employee.get('department', 'N/A')}",
+                      f"Position: {employee.get('position', 'N/A')}",
+                      f"Employee ID: {employee.get('employee_id', 'N/A')}")
+        for info_label, text in zip(self.details_info_labels, info_texts):
+            info_label.config(text=text)
         
-        # Department
-        dept_label = tk.Label(info_frame, text=f"Department: {employee.get('department', 'N/A')}", 
-                             font=('Arial', 11), 
-                             fg='#bdc3c7', bg='#34495e')
-        dept_label.pack(anchor=tk.W, pady=2)
+        # Calculate and display statistics
+        self.calculate_and_display_statistics(employee['name'])
+    
+    def show_statistics_error(self, message):
+        """Replace the statistics with an error message"""
+        for label in (self.today_status_label, self.week_hours_label, self.month_days_label):
+            label.pack_forget()
+        self.stats_error_label.config(text=message)
+        self.stats_error_label.pack(anchor=tk.W, pady=5)
+        self.show_recent_checkins([])
+    
+    def show_recent_checkins(self, records):
+        """Show recent check-ins as lines of one label"""
+        lines = []
+        for record in records[:RECENT_CHECKINS_SHOWN]:
+            if record.get('check_in_time'):
+                hours = f" ({record['total_hours']:.1f}h)" if record.get('total_hours') else ""
+                lines.append(f"• {record['date']} at {time_of_day(record['check_in_time'])}{hours}")
+        
+        if lines:
+            self.recent_checkins_label.config(text="\n".join(lines), fg='#ecf0f1')
+        else:
+            self.recent_checkins_label.config(text="No recent check-ins found", fg='#95a5a6')
+    
+    def fetch_employee_stats(self, employee_name):
+        """Query work statistics for an employee (runs on the stats worker, no Tk calls)"""
+        today = datetime.now()
         
-        # Position
-        pos_label = tk.Label(info_frame, text=f"Position: {employee.get('position', 'N/A')}", 
-                            font=('Arial', 11), 
-                            fg='#bdc3c7', bg='#34495e')
-        pos_label.pack(anchor=tk.W, pady=2)
+        # Calculate date ranges
+        # Last week (7 days ago to today)
+        last_week_start = (today - timedelta(days=7)).strftime("%Y-%m-%d")
+        today_str = today.strftime("%Y-%m-%d")
         
-        # Employee ID
-        id_label = tk.Label(info_frame, text=f"Employee ID: {employee.get('employee_id', 'N/A')}", 
-                           font=('Arial', 11), 
-                           fg='#bdc3c7', bg='#34495e')
-        id_label.pack(anchor=tk.W, pady=2)
+        # Current month
+        month_start = today.replace(day=1).strftime("%Y-%m-%d")
         
-        # Separator
-        separator = tk.Frame(self.details_content, bg='#7f8c8d', height=2)
-        separator.pack(fill=tk.X, pady=10)
+        # Hours last week, days this month and today's status in one aggregate query
+        total_hours_week, days_worked_month, checked_in_today = self.attendance_db.get_employee_stats(
+            employee_name, last_week_start, month_start, today_str)
         
-        # Work statistics
-        stats_label = tk.Label(self.details_content, text="Work Statistics", 
-                              font=('Arial', 12, 'bold'), 
-                              fg='#ecf0f1', bg='#34495e')
-        stats_label.pack(anchor=tk.W, pady=(10, 5))
+        recent_records = self.attendance_db.get_recent_checkins(employee_name, RECENT_CHECKINS_SHOWN)
         
-        # Calculate and display statistics
-        self.calculate_and_display_statistics(employee['name'])
+        return total_hours_week, days_worked_month, checked_in_today, recent_records
     
     def calculate_and_display_statistics(self, employee_name):
         """Calculate and display work statistics for employee"""
         if not self.attendance_db:
-            error_label = tk.Label(self.details_content, text="Attendance database not initialized.", 
-                                  font=('Arial', 10), 
-                                  fg='#e74c3c', bg='#34495e')
-            error_label.pack(anchor=tk.W, pady=5)
+            self.show_statistics_error("Attendance database not initialized.")
             return
-        try:
-            from datetime import datetime, timedelta
-            
-            # Get current date
-            today = datetime.now()
-            
-            # Calculate date ranges
-            # Last week (7 days ago to today)
-            last_week_start = (today - timedelta(days=7)).strftime("%Y-%m-%d")
-            last_week_end = today.strftime("%Y-%m-%d")
-            
-            # Current month
-            month_start = today.replace(day=1).strftime("%Y-%m-%d")
-            month_end = today.strftime("%Y-%m-%d")
-            
-            # Get attendance records
-            week_records = self.attendance_db.get_attendance_report(
-                last_week_start, last_week_end, employee_name)
-            month_records = self.attendance_db.get_attendance_report(
-                month_start, month_end, employee_name)
-            
-            # Calculate statistics
-            # Hours worked last week
-            total_hours_week = 0
-            for record in week_records:
-                if record.get('total_hours'):
-                    total_hours_week += record['total_hours']
-            
-            # Days worked this month
-            days_worked_month = len([r for r in month_records if r.get('check_in_time')])
-            
-            # Today's status
-            today_str = today.strftime("%Y-%m-%d")
-            today_records = self.attendance_db.get_attendance_report(
-                today_str, today_str, employee_name)
-            
-            today_status = "Present" if today_records else "Not checked in"
-            
-            # Display statistics
-            stats_frame = tk.Frame(self.details_content, bg='#34495e')
-            stats_frame.pack(fill=tk.X, pady=5)
-            
-            # Today's status
-            today_label = tk.Label(stats_frame, text=f"Today's Status: {today_status}", 
-                                  font=('Arial', 11), 
-                                  fg='#27ae60' if today_status == "Present" else '#e74c3c', 
-                                  bg='#34495e')
-            today_label.pack(anchor=tk.W, pady=2)
-            
-            # Hours last week
-            hours_label = tk.Label(stats_frame, text=f"Hours worked last week: {total_hours_week:.1f} hours", 
-                                  font=('Arial', 11), 
-                                  fg='#3498db', bg='#34495e')
-            hours_label.pack(anchor=tk.W, pady=2)
-            
-            # Days this month
-            days_label = tk.Label(stats_frame, text=f"Days worked this month: {days_worked_month} days", 
-                                 font=('Arial', 11), 
-                                 fg='#9b59b6', bg='#34495e')
-            days_label.pack(anchor=tk.W, pady=2)
-            
-            # Recent check-ins
-            recent_label = tk.Label(self.details_content, text="Recent Check-ins", 
-                                   font=('Arial', 12, 'bold'), 
-                                   fg='#ecf0f1', bg='#34495e')
-            recent_label.pack(anchor=tk.W, pady=(15, 5))
-            
-            # Show recent check-ins (last 5)
-            recent_frame = tk.Frame(self.details_content, bg='#2c3e50', relief=tk.SUNKEN, bd=1)
-            recent_frame.pack(fill=tk.X, pady=5)
-            
-            recent_records = week_records[-5:] if week_records else []
-            
-            if recent_records:
-                for record in reversed(recent_records):
-                    if record.get('check_in_time'):
-                        date_str = record['date']
-                        time_str = record['check_in_time'].split(' ')[1] if ' ' in record['check_in_time'] else record['check_in_time']
-                        hours = f" ({record['total_hours']:.1f}h)" if record.get('total_hours') else ""
-                        
-                        record_text = f"• {date_str} at {time_str}{hours}"
-                        record_label = tk.Label(recent_frame, text=record_text, 
-                                               font=('Arial', 10), 
-                                               fg='#ecf0f1', bg='#2c3e50')
-                        record_label.pack(anchor=tk.W, padx=10, pady=2)
-            else:
-                no_records_label = tk.Label(recent_frame, text="No recent check-ins found", 
-                                           font=('Arial', 10), 
-                                           fg='#95a5a6', bg='#2c3e50')
-                no_records_label.pack(anchor=tk.W, padx=10, pady=5)
         
-            
-        except Exception as e:
-            error_label = tk.Label(self.details_content, text=f"Error calculating statistics: {e}", 
-                                  font=('Arial', 10), 
-                                  fg='#e74c3c', bg='#34495e')
-            error_label.pack(anchor=tk.W, pady=5)
+        # Keep the event loop free while the queries run; show a placeholder meanwhile
+        self.stats_error_label.pack_forget()
+        for label in (self.today_status_label, self.week_hours_label, self.month_days_label):
+            label.pack(anchor=tk.W, pady=2)
+        self.today_status_var.set("Loading…")
+        self.today_status_label.config(fg='#95a5a6')
+        self.week_hours_var.set("")
+        self.month_days_var.set("")
+        self.show_recent_checkins([])
+        
+        future = self._db_executor.submit(self.fetch_employee_stats, employee_name)
+        self._stats_future = future
+        
+        def poll_stats():
+            if future is not self._stats_future or not self.details_body.winfo_exists():
+                return  # A newer selection replaced this one, or the window was closed
+            if not future.done():
+                self.details_body.after(DB_POLL_MS, poll_stats)
+                return
+            try:
+                self.render_employee_stats(*future.result())
+            except Exception as e:
+                self.show_statistics_error(f"Error calculating statistics: {e}")
+        
+        self.details_body.after(DB_POLL_MS, poll_stats)
+    
+    def render_employee_stats(self, total_hours_week, days_worked_month, checked_in_today, recent_records):
+        """Show fetched work statistics in the prebuilt labels"""
+        today_status = "Present" if checked_in_today else "Not checked in"
+        
+        # Display statistics
+        self.stats_error_label.pack_forget()
+        for label in (self.today_status_label, self.week_hours_label, self.month_days_label):
+            label.pack(anchor=tk.W, pady=2)
+        self.today_status_var.set(f"Today's Status: {today_status}")
+        self.today_status_label.config(fg='#27ae60' if today_status == "Present" else '#e74c3c')
+        self.week_hours_var.set(f"Hours worked last week: {total_hours_week:.1f} hours")
+        self.month_days_var.set(f"Days worked this month: {days_worked_month} days")
+        
+        self.show_recent_checkins(recent_records)
+    
+    def show_details_message(self, text, fg='#95a5a6', font=('Arial', 12)):
+        """Show a message in place of the employee details"""
+        self.details_body.pack_forget()
+        self.details_message_label.config(text=text, fg=fg, font=font)
+        self.details_message_label.pack(expand=True)
     
     def show_no_selection_message(self):
         """Show message when no employee is selected"""
-        # Clear previous content
-        for widget in self.details_content.winfo_children():
-            widget.destroy()
-        
-        # No selection message
-        message_label = tk.Label(self.details_content, 
-                                text="Select an employee from the list\nto view details", 
-                                font=('Arial', 12), 
-                                fg='#95a5a6', bg='#34495e',
-                                justify=tk.CENTER)
-        message_label.pack(expand=True)
+        self.show_details_message("Select an employee from the list\nto view details")
+    
+    def show_status(self, text):
+        """Show a status message in the employee window and clear it after a moment"""
+        if self._status_clear_id is not None:
+            self.status_label.after_cancel(self._status_clear_id)
+        self.status_var.set(text)
+        self._status_clear_id = self.status_label.after(STATUS_CLEAR_MS, self.clear_status)
+    
+    def clear_status(self):
+        """Clear the employee window status message"""
+        self._status_clear_id = None
+        self.status_var.set("")
     
     def refresh_employee_data(self):
         """Refresh employee data"""
+        # An explicit refresh always re-reads: the web server edits employees from
+        # another process, which this process's version counter cannot see
+        self.attendance_db.invalidate_cache()
         self.load_employee_data()
         self.show_no_selection_message()
-        CustomDialog.show_info(self.menu_window, "Refresh", "Employee data refreshed successfully")
+        self.show_status("Employee data refreshed")
 
         # Restore employee detail button
         #self.restore_button_on_window_close("employee_detail_btn")
@@ -663,10 +812,11 @@ class MenuManager:
             
             # Get selected employee
             selection = self.employee_listbox.curselection()[0]
-            employee_data = self.employee_listbox.get(selection)
-            
-            # Extract employee name (format: "Name (ID) - Department")
-            employee_name = employee_data.split(' (')[0].strip()
+            if selection >= len(self.employee_data):
+                return
+
+            # Take the name from the loaded record, not the displayed text
+            employee_name = self.employee_data[selection]['name']
             
             # Confirmation dialog
             confirm_message = f"""Are you sure you want to delete employee '{employee_name}'?
@@ -688,14 +838,8 @@ Do you want to continue?"""
                     self.load_employee_data()
                     
                     # Show success message in details area
-                    for widget in self.details_content.winfo_children():
-                        widget.destroy()
-                    
-                    success_label = tk.Label(self.details_content, 
-                                           text=f"Employee '{employee_name}'\nsuccessfully deleted", 
-                                           font=('Arial', 16, 'bold'), 
-                                           fg='#27ae60', bg='#34495e')
-                    success_label.pack(expand=True)
+                    self.show_details_message(f"Employee '{employee_name}'\nsuccessfully deleted", 
+                                              fg='#27ae60', font=('Arial', 16, 'bold'))
                     
                 else:
                     CustomDialog.show_error(self.menu_window, "Error", 
@@ -716,8 +860,7 @@ Do you want to continue?"""
             return
        
         
-        for widget in self.menu_window.winfo_children():
-            widget.destroy()
+        self.clear_menu_window()
         try:
             success = self.show_edit_employee_dialog(selected_employee)
             
@@ -814,8 +957,7 @@ Do you want to continue?"""
         result = {'success': False}
         
         def clean_window():
-            for widget in self.menu_window.winfo_children():
-                widget.destroy()
+            self.clear_menu_window()
             self.show_employee_detail_window()
 
         def on_save():
@@ -877,38 +1019,17 @@ Do you want to continue?"""
             return
         
         try:
-            from datetime import datetime
             today = datetime.now().strftime("%Y-%m-%d")
-            records = self.attendance_db.get_attendance_report(today, today)
-            
-            checkins = [record for record in records if record.get('check_in_time')]
+            checkins = self.attendance_db.get_checkins_on(today)
             
             if not checkins:
                 CustomDialog.show_info(self.menu_window, "Today's Check-ins", "No check-ins recorded for today.")
                 return
             
             # Create detailed report
-            report = f"Today's Check-ins ({today})\n\n"
-            report += f"Total Check-ins: {len(checkins)}\n\n"
-            
-            # Sort by check-in time
-            checkins.sort(key=lambda x: x['check_in_time'])
-            
-            for i, record in enumerate(checkins, 1):
-                name = record['name']
-                check_in_time = record['check_in_time']
-                
-                # Format time
-                if isinstance(check_in_time, str):
-                    try:
-                        time_obj = datetime.strptime(check_in_time, "%Y-%m-%d %H:%M:%S")
-                        formatted_time = time_obj.strftime("%H:%M:%S")
-                    except:
-                        formatted_time = check_in_time
-                else:
-                    formatted_time = str(check_in_time)
-                
-                report += f"{i}. {name} - {formatted_time}\n"
+            header = f"Today's Check-ins ({today})\n\nTotal Check-ins: {len(checkins)}\n\n"
+            report = header + "".join(f"{i}. {record['name']} - {time_of_day(record['check_in_time'])}\n"
+                                      for i, record in enumerate(checkins, 1))
             
             CustomDialog.show_info(self.menu_window,"Today's Check-ins", report)
             
@@ -927,13 +1048,11 @@ Do you want to continue?"""
                 CustomDialog.show_info(self.menu_window,"Employee List", "No employees registered in the system.")
                 return
             
-            report = f"Registered Employees ({len(employees)} total)\n\n"
-            
-            for i, employee in enumerate(employees, 1):
-                name = employee['name']
-                dept = employee.get('department', 'N/A')
-                position = employee.get('position', 'N/A')
-                report += f"{i}. {name}\n   Department: {dept}\n   Position: {position}\n\n"
+            header = f"Registered Employees ({len(employees)} total)\n\n"
+            report = header + "".join(EMPLOYEE_REPORT_ENTRY % (i, employee['name'],
+                                                               employee['department'] or 'N/A',
+                                                               employee['position'] or 'N/A')
+                                      for i, employee in enumerate(employees, 1))
             
             CustomDialog.show_info(self.menu_window,"Employee List", report)
             
@@ -946,28 +1065,21 @@ Do you want to continue?"""
     
     def show_add_employee_dialog(self):
         """Show dialog to add a new employee"""
-        # Create dialog window
-        dialog = tk.Toplevel(self.menu_window)
-        dialog.grab_set()
-        dialog.title("Add New Employee")
-        dialog.configure(bg='#2c3e50')
-        dialog.resizable(False, False)
-        dialog.transient(self.menu_window)
-        
-        # Center dialog relative to parent
-        dialog.update_idletasks()
+        # The dialog is built once per menu window and hidden, not destroyed, on close
+        if self._add_employee_dialog is None or not self._add_employee_dialog['dialog'].winfo_exists():
+            self._add_employee_dialog = self.create_add_employee_dialog()
+        form = self._add_employee_dialog
+        dialog = form['dialog']
+        
+        for var in form['vars'].values():
+            var.set("")
+        form['result']['success'] = False
+        form['done'].set(False)
+        
+        # Center dialog relative to parent, using the tracked menu geometry
         width = 500
         height = 450
-        
-        # Get parent window position and size
-        if self.menu_window:
-            self.menu_window.update_idletasks()
-            parent_x = self.menu_window.winfo_x()
-            parent_y = self.menu_window.winfo_y()
-            parent_width = self.menu_window.winfo_width()
-            parent_height = self.menu_window.winfo_height()
-        else:
-            parent_x = parent_y = parent_width = parent_height = 0
+        parent_x, parent_y, parent_width, parent_height = self._menu_geom
         
         # Calculate center position relative to parent
         x = parent_x + (parent_width - width) // 2
@@ -975,6 +1087,25 @@ Do you want to continue?"""
         
         dialog.geometry(f"{width}x{height}+{x}+{y}")
         
+        dialog.deiconify()
+        dialog.grab_set()
+        form['fields']['name'].focus_set()
+        
+        # Wait until saved or cancelled; the dialog itself stays alive for the next use
+        dialog.wait_variable(form['done'])
+        
+        return form['result']['success']
+    
+    def create_add_employee_dialog(self):
+        """Build the (initially hidden) add employee dialog and return its parts"""
+        # Create dialog window
+        dialog = tk.Toplevel(self.menu_window)
+        dialog.withdraw()
+        dialog.title("Add New Employee")
+        dialog.configure(bg='#2c3e50')
+        dialog.resizable(False, False)
+        dialog.transient(self.menu_window)
+        
         # Main frame
         main_frame = tk.Frame(dialog, bg='#2c3e50')
         main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
@@ -1008,7 +1139,6 @@ Do you want to continue?"""
                                  font=('Arial', 12), 
                                  bg='#ffffff', fg='#2c3e50', width=40)
         fields['name'].pack(fill=tk.X, pady=(0, 15))
-        fields['name'].focus_set()
         
         # Employee ID field
         id_label = tk.Label(content_frame, text="Employee ID", 
@@ -1046,9 +1176,9 @@ Do you want to continue?"""
                                      bg='#ffffff', fg='#2c3e50', width=40)
         fields['position'].pack(fill=tk.X, pady=(0, 15))
         
-        # Set up virtual keyboards for all entry fields
-        for field_name, entry_widget in fields.items():
-            self.setup_virtual_keyboard_for_entry(entry_widget, field_vars[field_name], main_frame)
+        # Set up virtual keyboards for all entry fields (kept with the dialog, hidden on close)
+        keyboards = [self.setup_virtual_keyboard_for_entry(entry_widget, field_vars[field_name], main_frame)
+                     for field_name, entry_widget in fields.items()]
         
         # Button frame
         button_frame = tk.Frame(main_frame, bg='#2c3e50')
@@ -1056,6 +1186,16 @@ Do you want to continue?"""
         
         # Result storage
         result = {'success': False}
+        done = tk.BooleanVar(dialog, value=False)
+        
+        def close_dialog():
+            """Hide the dialog and its keyboards and end the wait in show_add_employee_dialog"""
+            for keyboard in keyboards:
+                if keyboard:
+                    keyboard.destroy()
+            dialog.grab_release()
+            dialog.withdraw()
+            done.set(True)
         
         def on_save():
             """Handle save button click"""
@@ -1082,8 +1222,7 @@ Do you want to continue?"""
                 if success:
                     result['success'] = True
                     CustomDialog.show_info(dialog, "Success", f"Employee '{name}' added successfully!")
-                    self.cleanup_keyboards()
-                    dialog.destroy()
+                    close_dialog()
                 else:
                     CustomDialog.show_error(dialog, "Error", f"Employee '{name}' already exists!")
                     
@@ -1092,8 +1231,7 @@ Do you want to continue?"""
         
         def on_cancel():
             """Handle cancel button click"""
-            self.cleanup_keyboards()
-            dialog.destroy()
+            close_dialog()
         
         # Save button
         save_btn = tk.Button(button_frame, text="Save Employee", 
@@ -1116,10 +1254,10 @@ Do you want to continue?"""
         cancel_btn.pack(side=tk.RIGHT)
         
         # Handle window close
-        def on_window_close():
-            self.cleanup_keyboards()
-            on_cancel()
-        dialog.protocol("WM_DELETE_WINDOW", on_window_close)
+        dialog.protocol("WM_DELETE_WINDOW", on_cancel)
+        
+        # Don't leave show_add_employee_dialog waiting if the menu is torn down underneath it
+        dialog.bind('<Destroy>', lambda event: done.set(True) if event.widget is dialog else None)
         
         # Bind Enter and Escape keys
         def on_enter(event):
@@ -1131,17 +1269,12 @@ Do you want to continue?"""
         dialog.bind('<Return>', on_enter)
         dialog.bind('<Escape>', on_escape)
         
-        # Focus and wait
-        dialog.focus()
-        dialog.wait_window()
-        
-        return result.get('success', False)
+        return {'dialog': dialog, 'vars': field_vars, 'fields': fields, 'result': result, 'done': done}
 
     def show_edit(self):
         # Clear the current frame and show edit interface
         if self.menu_window and self.menu_window.winfo_exists():
-            for widget in self.menu_window.winfo_children():
-                widget.destroy()
+            self.clear_menu_window()
             self.edit_todays_checkins()
     
     def edit_todays_checkins(self):
@@ -1150,68 +1283,59 @@ Do you want to continue?"""
             CustomDialog.show_warning(self.menu_window, "Warning", "Attendance database not available")
             return
         
-        try:
-            from datetime import datetime
-            today = datetime.now().strftime("%Y-%m-%d")
-            
-            # Get all employees
-            all_employees = self.attendance_db.get_employees()
-            
-            # Get today's attendance records
-            attendance_records = self.attendance_db.get_attendance_report(today, today)
-            
-            # Create a dictionary of attendance records by employee name
-            attendance_dict = {}
-            for record in attendance_records:
-                attendance_dict[record['name']] = record
-            
-            # Combine all employees with their attendance status
-            combined_data = []
-            
-            # Add not checked-in employees first
-            for employee in all_employees:
-                if employee['name'] not in attendance_dict:
-                    combined_data.append({
-                        'name': employee['name'],
-                        'check_in_time': None,
-                        'check_out_time': None,
-                        'status': 'Not Checked In',
-                        'total_hours': None,
-                        'date': today,
-                        'is_checked_in': False
-                    })
-            
-            # Add checked-in employees, sorted by latest check-in to oldest
-            checked_in_employees = []
-            for employee in all_employees:
-                if employee['name'] in attendance_dict:
-                    record = attendance_dict[employee['name']]
-                    record['is_checked_in'] = True
-                    checked_in_employees.append(record)
-            
-            # Sort checked-in employees by check-in time (latest first)
-            checked_in_employees.sort(key=lambda x: x.get('check_in_time', ''), reverse=True)
-            
-            # Combine: not checked-in first, then checked-in (latest to oldest)
-            combined_data.extend(checked_in_employees)
-            
-            # Create edit window with all employee data
-            self.create_edit_checkins_window(combined_data)
-            
-        except Exception as e:
-            CustomDialog.show_error(self.menu_window, "Error", f"Failed to load employee data: {e}")
+        # Show the (empty) window right away and fill it when the queries finish
+        self.create_edit_checkins_window([])
+        
+        def on_loaded(rows):
+            combined_data, _ = rows
+            self.edit_checkins_data = combined_data
+            self.populate_employee_table(combined_data)
+        
+        self.run_db_task(self.employee_table, self.build_todays_attendance_rows, on_loaded,
+                         "Failed to load employee data")
+    
+    def build_todays_attendance_rows(self):
+        """Return (rows, checked-in count) for the edit view: not checked-in employees
+        in name order, then today's check-ins from latest to oldest"""
+        today = datetime.now().strftime("%Y-%m-%d")
+        
+        # Today's attendance records by employee name
+        attendance_dict = {record['name']: record
+                           for record in self.attendance_db.get_attendance_report(today, today)}
+        
+        # One pass over the employees splits them into the two blocks
+        not_checked_in = []
+        checked_in_employees = []
+        for employee in self.attendance_db.get_employees():
+            record = attendance_dict.get(employee['name'])
+            if record is None:
+                not_checked_in.append({
+                    'name': employee['name'],
+                    'check_in_time': None,
+                    'check_out_time': None,
+                    'status': 'Not Checked In',
+                    'total_hours': None,
+                    'date': today,
+                    'is_checked_in': False
+                })
+            else:
+                record['is_checked_in'] = True
+                checked_in_employees.append(record)
+        
+        # Sort checked-in employees by check-in time (latest first)
+        checked_in_employees.sort(key=itemgetter('check_in_time'), reverse=True)
+        
+        return not_checked_in + checked_in_employees, len(checked_in_employees)
     
     def show_checkin(self):
         # Clear the current frame and show checkin photos interface
         if self.menu_window and self.menu_window.winfo_exists():
-            for widget in self.menu_window.winfo_children():
-                widget.destroy()
+            self.clear_menu_window()
             self.show_checkin_photos()
 
     def close_edit_window(self):
       if self.menu_window:
-        for widget in self.menu_window.winfo_children():
-            widget.destroy()
+        self.clear_menu_window()
         self.show_menu()
 
     def create_edit_checkins_window(self, checkins):
@@ -1320,59 +1444,17 @@ Do you want to continue?"""
         if not self.attendance_db:
             CustomDialog.show_error(self.menu_window, "Error", "Attendance database not initialized.")
             return
-        try:
-            from datetime import datetime
-            today = datetime.now().strftime("%Y-%m-%d")
-            
-            # Get all employees
-            all_employees = self.attendance_db.get_employees()
-            
-            # Get today's attendance records
-            attendance_records = self.attendance_db.get_attendance_report(today, today)
-            
-            # Create a dictionary of attendance records by employee name
-            attendance_dict = {}
-            for record in attendance_records:
-                attendance_dict[record['name']] = record
-            
-            # Combine all employees with their attendance status
-            combined_data = []
-            
-            # Add not checked-in employees first
-            for employee in all_employees:
-                if employee['name'] not in attendance_dict:
-                    combined_data.append({
-                        'name': employee['name'],
-                        'check_in_time': None,
-                        'check_out_time': None,
-                        'status': 'Not Checked In',
-                        'total_hours': None,
-                        'date': today,
-                        'is_checked_in': False
-                    })
-            
-            # Add checked-in employees, sorted by latest check-in to oldest
-            checked_in_employees = []
-            for employee in all_employees:
-                if employee['name'] in attendance_dict:
-                    record = attendance_dict[employee['name']]
-                    record['is_checked_in'] = True
-                    checked_in_employees.append(record)
-            
-            # Sort checked-in employees by check-in time (latest first)
-            checked_in_employees.sort(key=lambda x: x.get('check_in_time', ''), reverse=True)
-            
-            # Combine: not checked-in first, then checked-in (latest to oldest)
-            combined_data.extend(checked_in_employees)
+        def on_loaded(rows):
+            combined_data, checked_in_count = rows
             
             # Store and populate the updated data
             self.edit_checkins_data = combined_data
             self.populate_employee_table(combined_data)
             
-            CustomDialog.show_info(self.menu_window, "Refresh Complete", f"List refreshed. {len(all_employees)} total employees, {len(checked_in_employees)} checked in.")
-                
-        except Exception as e:
-            CustomDialog.show_error(self.menu_window, "Error", f"Failed to refresh list: {e}")
+            CustomDialog.show_info(self.menu_window, "Refresh Complete", f"List refreshed. {len(combined_data)} total employees, {checked_in_count} checked in.")
+        
+        self.run_db_task(self.employee_table, self.build_todays_attendance_rows, on_loaded,
+                         "Failed to refresh list")
     
  
     
@@ -1383,49 +1465,40 @@ Do you want to continue?"""
         """Populate the table with employee entries including check-out time and status"""
         self.employee_table.delete(*self.employee_table.get_children())
         
+        # Bound once; both are looked up for every row otherwise
+        insert = self.employee_table.insert
+        table_row = self.employee_table_row
+        
         for record in employee_data:
-            name = record['name']
-            check_in_time = record.get('check_in_time')
-            check_out_time = record.get('check_out_time')
-            
-            # Format check-in time
-            if check_in_time:
-                if isinstance(check_in_time, str):
-                    try:
-                        from datetime import datetime
-                        time_obj = datetime.strptime(check_in_time, "%Y-%m-%d %H:%M:%S")
-                        formatted_check_in = time_obj.strftime("%H:%M:%S")
-                    except:
-                        formatted_check_in = check_in_time
-                else:
-                    formatted_check_in = str(check_in_time)
-            else:
-                formatted_check_in = "Not Checked In"
-            
-            # Format check-out time
-            if check_out_time:
-                if isinstance(check_out_time, str):
-                    try:
-                        from datetime import datetime
-                        time_obj = datetime.strptime(check_out_time, "%Y-%m-%d %H:%M:%S")
-                        formatted_check_out = time_obj.strftime("%H:%M:%S")
-                    except:
-                        formatted_check_out = check_out_time
-                else:
-                    formatted_check_out = str(check_out_time)
-            else:
-                formatted_check_out = "Not Checked Out" if check_in_time else "N/A"
-            
-            # Determine status display
-            if not check_in_time:
-                status_display = "Not Checked In"
-            elif check_out_time:
-                status_display = "Checked Out"
-            else:
-                status_display = "Checked In"
-            
             # Insert row into table
-            self.employee_table.insert('', 'end', values=(name, formatted_check_in, formatted_check_out, status_display))
+            insert('', 'end', values=table_row(record))
+    
+    @staticmethod
+    def employee_table_row(record):
+        """Return the (name, check-in, check-out, status) cells shown for an attendance record"""
+        check_in_time, check_out_time = CHECK_TIMES(record)
+        
+        # Format check-in time
+        if check_in_time:
+            formatted_check_in = time_of_day(check_in_time)
+        else:
+            formatted_check_in = "Not Checked In"
+        
+        # Format check-out time
+        if check_out_time:
+            formatted_check_out = time_of_day(check_out_time)
+        else:
+            formatted_check_out = "Not Checked Out" if check_in_time else "N/A"
+        
+        # Determine status display
+        if not check_in_time:
+            status_display = "Not Checked In"
+        elif check_out_time:
+            status_display = "Checked Out"
+        else:
+            status_display = "Checked In"
+        
+        return (record['name'], formatted_check_in, formatted_check_out, status_display)
     
     def on_checkin_double_click(self, event):
         """Handle double-click on check-in entry"""
@@ -1442,7 +1515,7 @@ Do you want to continue?"""
             return
             
         selection = self.employee_table.selection()
-        print(f"Selection: {selection}")
+        log.debug("Selection: %s", selection)
         
         if not selection:
             CustomDialog.show_warning(self.menu_window, "Warning", "Please select an entry to delete.")
@@ -1461,12 +1534,9 @@ Do you want to continue?"""
         formatted_check_in = item_values[1]
         status_display = item_values[3]
         
-        # Find the corresponding record in our data
-        record_to_delete = None
-        for record in self.edit_checkins_data:
-            if record['name'] == name:
-                record_to_delete = record
-                break
+        # Table rows are inserted in the same order as edit_checkins_data
+        row_index = self.employee_table.index(selected_item)
+        record_to_delete = self.edit_checkins_data[row_index] if row_index < len(self.edit_checkins_data) else None
         
         if not record_to_delete:
             CustomDialog.show_error(self.menu_window, "Error", "Could not find employee record.")
@@ -1481,7 +1551,7 @@ Do you want to continue?"""
                                  "Only actual check-in records can be deleted.")
             return
         
-        print(f"Attempting to delete check-in for {name} at {check_in_time}")
+        log.debug("Attempting to delete check-in for %s at %s", name, check_in_time)
 
         # Confirm deletion using the formatted time from the table
         result = CustomDialog.ask_yes_no(self.menu_window, "Confirm Deletion", 
@@ -1492,138 +1562,45 @@ Do you want to continue?"""
         
         if result:
             try:
-                print(f"User confirmed deletion, calling database delete...")
+                log.debug("User confirmed deletion, calling database delete")
                 # Delete from database
                 success = self.attendance_db.delete_checkin(name, check_in_time)
-                print(f"Database delete result: {success}")
+                log.debug("Database delete result: %s", success)
                     
                 if success:
-                    print("Database deletion successful, updating UI...")
+                    log.debug("Database deletion successful, updating UI")
                     
-                    # Refresh using the same logic as refresh_checkins_list
-                    from datetime import datetime
-                    today = datetime.now().strftime("%Y-%m-%d")
+                    # Only this employee's row changes: it moves back into the
+                    # not-checked-in block (kept in name order), so no re-query is needed
+                    del self.edit_checkins_data[row_index]
+                    self.employee_table.delete(selected_item)
                     
-                    # Get all employees
-                    all_employees = self.attendance_db.get_employees()
-                    
-                    # Get today's attendance records
-                    attendance_records = self.attendance_db.get_attendance_report(today, today)
-                    
-                    # Create a dictionary of attendance records by employee name
-                    attendance_dict = {}
-                    for record in attendance_records:
-                        attendance_dict[record['name']] = record
-                    
-                    # Combine all employees with their attendance status
-                    combined_data = []
-                    
-                    # Add not checked-in employees first
-                    for employee in all_employees:
-                        if employee['name'] not in attendance_dict:
-                            combined_data.append({
-                                'name': employee['name'],
-                                'check_in_time': None,
-                                'check_out_time': None,
-                                'status': 'Not Checked In',
-                                'total_hours': None,
-                                'date': today,
-                                'is_checked_in': False
-                            })
-                    
-                    # Add checked-in employees, sorted by latest check-in to oldest
-                    checked_in_employees = []
-                    for employee in all_employees:
-                        if employee['name'] in attendance_dict:
-                            record = attendance_dict[employee['name']]
-                            record['is_checked_in'] = True
-                            checked_in_employees.append(record)
-                    
-                    # Sort checked-in employees by check-in time (latest first)
-                    checked_in_employees.sort(key=lambda x: x.get('check_in_time', ''), reverse=True)
-                    
-                    # Combine: not checked-in first, then checked-in (latest to oldest)
-                    combined_data.extend(checked_in_employees)
-                    
-                    # Update data and UI
-                    self.edit_checkins_data = combined_data
-                    
-                    print(f"Refreshed data from database, now have {len(self.edit_checkins_data)} total employees")
-                    
-                    # Clear table completely and repopulate
-                    self.employee_table.delete(*self.employee_table.get_children())
-                    self.populate_employee_table(self.edit_checkins_data)
+                    not_checked_in = {
+                        'name': name,
+                        'check_in_time': None,
+                        'check_out_time': None,
+                        'status': 'Not Checked In',
+                        'total_hours': None,
+                        'date': record_to_delete.get('date'),
+                        'is_checked_in': False
+                    }
+                    position = next((i for i, record in enumerate(self.edit_checkins_data)
+                                     if record.get('is_checked_in') or record['name'] > name),
+                                    len(self.edit_checkins_data))
+                    self.edit_checkins_data.insert(position, not_checked_in)
+                    self.employee_table.insert('', position, values=self.employee_table_row(not_checked_in))
                     
                     CustomDialog.show_info(self.menu_window, "Success", f"Check-in for {name} deleted successfully.")
-                    print("Table repopulated with remaining data")
+                    log.debug("Table row updated")
                 else:
-                    print("Database deletion failed")
+                    log.warning("Database deletion failed for %s", name)
                     CustomDialog.show_error(self.menu_window, "Error", f"Failed to delete check-in for {name}.")
                      
             except Exception as e:
-                print(f"Exception during deletion: {e}")
+                log.error("Exception during deletion: %s", e)
                 CustomDialog.show_error(self.menu_window, "Error", f"Failed to delete check-in: {e}")
         else:
-            print("User cancelled deletion")
-    
-
-    def sync_dataset_with_database(self):
-        """Sync existing dataset users with the attendance database"""
-        if not self.attendance_db:
-            print("No attendance database available for sync")
-            return
-            
-        try:
-            # Get all existing users from dataset
-            dataset_users = set()
-            if os.path.exists('dataset'):
-                for dirname in os.listdir('dataset'):
-                    dir_path = os.path.join('dataset', dirname)
-                    if os.path.isdir(dir_path):
-                        txt_file = os.path.join(dir_path, f"{dirname}.txt")
-                        if os.path.exists(txt_file):
-                            with open(txt_file, 'r') as f:
-                                name = f.read().strip()
-                                if name:
-                                    dataset_users.add(name)
-            
-            # Get existing employees from database
-            existing_employees = set()
-            try:
-                employees = self.attendance_db.get_employees()
-                for employee in employees:
-                    existing_employees.add(employee['name'])
-            except:
-                pass
-            
-            # Find users in dataset but not in database
-            new_users = dataset_users - existing_employees
-            
-            # Add missing users to database
-            added_count = 0
-            for user_name in new_users:
-                try:
-                    success = self.attendance_db.add_employee(
-                        name=user_name,
-                        employee_id=None,
-                        department="Kitchen",
-                        position="Employee"
-                    )
-                    if success:
-                        added_count += 1
-                        print(f"Synced '{user_name}' to database")
-                except Exception as e:
-                    print(f"Failed to sync '{user_name}': {e}")
-            
-            if added_count > 0:
-                print(f"Synced {added_count} users from dataset to database")
-            elif len(dataset_users) > 0:
-                print(f"All {len(dataset_users)} dataset users are already in database")
-            else:
-                print("No users found in dataset to sync")
-                
-        except Exception as e:
-            print(f"Error syncing dataset with database: {e}")
+            log.debug("User cancelled deletion")
     
 
     def show_checkin_photos(self):
@@ -1790,11 +1767,7 @@ Do you want to continue?"""
             checkins = [r for r in records if r.get('check_in_time')]
 
             # Update employee header
-            try:
-                formatted_date = datetime.strptime(selected_date, '%Y-%m-%d').strftime('%B %d, %Y')
-            except:
-                formatted_date = selected_date
-            self.employee_header.config(text=f"Employees on {formatted_date}")
+            self.employee_header.config(text=f"Employees on {long_date(selected_date)}")
             
             # Clear and populate employee listbox
             self.employee_listbox.delete(0, tk.END)
@@ -1805,22 +1778,14 @@ Do you want to continue?"""
                 return
             
             # Sort by check-in time
-            checkins.sort(key=lambda x: x['check_in_time'])
+            checkins.sort(key=itemgetter('check_in_time'))
             
-            # Add employees to listbox
-            for record in checkins:
-                name = record['name']
-                check_in_time = record['check_in_time']
-                
-                # Format time
-                try:
-                    time_obj = datetime.strptime(check_in_time, "%Y-%m-%d %H:%M:%S")
-                    formatted_time = time_obj.strftime("%H:%M:%S")
-                except:
-                    formatted_time = check_in_time
-                
-                display_text = f"{name} - {formatted_time}"
-                self.employee_listbox.insert(tk.END, display_text)
+            # Add employees to listbox in one call
+            self.employee_listbox.insert(tk.END, *(f"{record['name']} - {time_of_day(record['check_in_time'])}"
+                                                   for record in checkins))
+            
+            # Build the photo paths now so selecting a row is just a lookup
+            self._photo_paths = {record['name']: self.checkin_photo_path(record) for record in checkins}
                 
         except Exception as e:
             CustomDialog.show_error(self.menu_window,"Error", f"Failed to load employees for date: {e}")
@@ -1908,10 +1873,12 @@ Do you want to continue?"""
                              relief=tk.RAISED, bd=2)
         close_btn.pack(side=tk.RIGHT)
     def close_checkin(self):
+        # Release the decoded photos along with the viewer
+        load_checkin_photo.cache_clear()
+        self.current_photo_ref = None
         # Clear the current frame and show main menu
         if self.menu_window and self.menu_window.winfo_exists():
-            for widget in self.menu_window.winfo_children():
-                widget.destroy()
+            self.clear_menu_window()
             self.show_menu()
 
 
@@ -1921,19 +1888,19 @@ Do you want to continue?"""
         if not self.attendance_db:
             CustomDialog.show_error(self.menu_window,"Error", "Attendance database not initialized.")
             return
+        self.run_db_task(self.checkin_listbox, self.fetch_checkin_date_counts, self.show_checkin_dates,
+                         "Failed to load check-in dates")
+    
+    def fetch_checkin_date_counts(self):
+        """Return {date: check-in count}, newest date first (runs on the database worker)"""
+        date_counts = Counter(record['date'] for record in self.attendance_db.get_attendance_report()
+                              if record.get('check_in_time'))
+        return dict(sorted(date_counts.items(), reverse=True))
+    
+    def show_checkin_dates(self, date_counts):
+        """Show the current page of check-in dates"""
         try:
-            from datetime import datetime, timedelta
-            
-            # Get all dates with check-ins
-            records = self.attendance_db.get_attendance_report()
-            checkin_dates = set()
-            
-            for record in records:
-                if record.get('check_in_time'):
-                    checkin_dates.add(record['date'])
-            
-            # Sort dates (newest first)
-            sorted_dates = sorted(list(checkin_dates), reverse=True)
+            sorted_dates = list(date_counts)
             
             # Paginate
             start_idx = self.current_page * self.dates_per_page
@@ -1948,21 +1915,9 @@ Do you want to continue?"""
                 self.checkin_listbox.insert(tk.END, "No check-ins found")
                 return
             
-            # Add dates to listbox
-            for date in page_dates:
-                # Get count of check-ins for this date
-                date_records = [r for r in records if r['date'] == date and r.get('check_in_time')]
-                count = len(date_records)
-                
-                # Format date display
-                try:
-                    date_obj = datetime.strptime(date, '%Y-%m-%d')
-                    formatted_date = date_obj.strftime('%B %d, %Y')
-                    display_text = f"{formatted_date} ({count} check-ins)"
-                except:
-                    display_text = f"{date} ({count} check-ins)"
-                
-                self.checkin_listbox.insert(tk.END, display_text)
+            # Build the date rows, then add them to the listbox in one call
+            items = [f"{long_date(date)} ({date_counts[date]} check-ins)" for date in page_dates]
+            self.checkin_listbox.insert(tk.END, *items)
             
             # Update pagination controls
             self.update_pagination_controls(len(sorted_dates))
@@ -1978,6 +1933,11 @@ Do you want to continue?"""
         clean_name = clean_name.replace(' ', '_')
         return clean_name
     
+    def checkin_photo_path(self, record):
+        """Return the path a check-in photo is saved under: CheckinPhoto/<date>/<clean_name>_<HH-MM-SS>.jpg"""
+        formatted_time = time_of_day(record['check_in_time']).replace(':', '-')
+        return os.path.join("CheckinPhoto", record['date'], f"{self.get_clean_name(record['name'])}_{formatted_time}.jpg")
+    
     def show_checkin_photo(self, record):
         """Show check-in photo for selected employee"""
         # Clear previous content
@@ -1989,16 +1949,7 @@ Do you want to continue?"""
             name = record['name']
             check_in_time = record['check_in_time']
             date = record['date']
-            
-            # Format time for filename
-            time_obj = datetime.strptime(check_in_time, "%Y-%m-%d %H:%M:%S")
-            formatted_time = time_obj.strftime("%H-%M-%S")
-            
-            # Clean name for filename
-            clean_name = self.get_clean_name(name)
-            
-            # Construct photo path
-            photo_path = os.path.join("CheckinPhoto", date, f"{clean_name}_{formatted_time}.jpg")
+            photo_path = self._photo_paths.get(name) or self.checkin_photo_path(record)
             
             # Employee info
             info_frame = tk.Frame(self.photo_content, bg='#34495e')
@@ -2009,12 +1960,12 @@ Do you want to continue?"""
                                  fg='#ecf0f1', bg='#34495e')
             name_label.pack(anchor=tk.W)
             
-            time_label = tk.Label(info_frame, text=f"Check-in Time: {time_obj.strftime('%H:%M:%S')}", 
+            time_label = tk.Label(info_frame, text=f"Check-in Time: {time_of_day(check_in_time)}", 
                                  font=('Arial', 10), 
                                  fg='#bdc3c7', bg='#34495e')
             time_label.pack(anchor=tk.W)
             
-            date_label = tk.Label(info_frame, text=f"Date: {time_obj.strftime('%B %d, %Y')}", 
+            date_label = tk.Label(info_frame, text=f"Date: {long_date(date)}", 
                                  font=('Arial', 10), 
                                  fg='#bdc3c7', bg='#34495e')
             date_label.pack(anchor=tk.W)
@@ -2026,33 +1977,9 @@ Do you want to continue?"""
             # Try to load and display photo
             if os.path.exists(photo_path):
                 try:
-                    # Load image
-                    import cv2
-                    from PIL import Image, ImageTk
-                    
-                    # Read image
-                    img = cv2.imread(photo_path)
-                    if img is not None:
-                        # Convert color
-                        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-                        
-                        # Resize image to fit display
-                        pil_img = Image.fromarray(img_rgb)
-                        
-                        # Calculate size to fit in frame (max 400x400)
-                        max_size = 400
-                        img_width, img_height = pil_img.size
-                        
-                        if img_width > max_size or img_height > max_size:
-                            # Calculate scaling factor
-                            scale = min(max_size / img_width, max_size / img_height)
-                            new_width = int(img_width * scale)
-                            new_height = int(img_height * scale)
-                            pil_img = pil_img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                        
-                        # Convert to PhotoImage
-                        photo = ImageTk.PhotoImage(pil_img)
-                        
+                    # Decoded once per path; re-selecting a record reuses the image
+                    photo = load_checkin_photo(photo_path)
+                    if photo is not None:
                         # Display image
                         img_label = tk.Label(photo_frame, image=photo, bg='#2c3e50')
                         # Store reference to prevent garbage collection
@@ -2515,8 +2442,7 @@ Do you want to continue?"""
                    
                     self.cleanup_keyboards()
                     # Go back to main menu
-                    for widget in self.menu_window.winfo_children():
-                        widget.destroy()
+                    self.clear_menu_window()
                     self.show_menu()
                 else:
                     CustomDialog.show_error(self.menu_window, "Save Error", "Failed to save attendance settings!")
@@ -2529,8 +2455,7 @@ Do you want to continue?"""
             
             self.cleanup_keyboards()
             # Go back to main menu
-            for widget in self.menu_window.winfo_children():
-                widget.destroy()
+            self.clear_menu_window()
             self.show_menu()
         
         # Save button
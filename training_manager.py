@@ -210,8 +210,8 @@ class TrainingManager:
             os.makedirs(user_dir, exist_ok=True)
             
             # Count existing images for this user in their directory
-            existing_count = len([f for f in os.listdir(user_dir) 
-                                if f.startswith(f'{clean_name}_') and f.endswith('.jpg')])
+            existing_count = sum(1 for f in os.listdir(user_dir)
+                                 if f.startswith(f'{clean_name}_') and f.endswith('.jpg'))
             
             filename = f"{user_dir}/{clean_name}_{existing_count + self.capture_count + 1}.jpg"
             self.capture_count += 1
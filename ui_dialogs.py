@@ -33,22 +33,8 @@ class CustomDialog:
         dialog.resizable(False, False)
         dialog.transient(parent)
     
-        # Center dialog relative to parent
-        dialog.update_idletasks()
-        width =400
-        height = 400
+        # Fixed placement, so no geometry pass is needed before the widgets exist
         dialog.geometry(f"{600}x{400}+{10}+{200}")
-        # Get parent window position and size
-        parent.update_idletasks()
-        parent_x = parent.winfo_x()
-        parent_y = parent.winfo_y()
-        parent_width = parent.winfo_width()
-        parent_height = parent.winfo_height()
-        print(parent_width,parent_height)
-        print(parent_x,parent_y)
-        # Calculate center position relative to parent
-        x = parent_x  // 2
-        y = parent_y// 2
         
         # Main frame
         main_frame = tk.Frame(dialog, bg='#2c3e50')